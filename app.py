@@ -1,4 +1,4 @@
-def start_my_app():
+def start_my_app(serve=True):
     import os
     import json
     import base64
@@ -8,24 +8,117 @@ def start_my_app():
     import time
     import logging
     import traceback
+    import threading
     from threading import Thread, Timer
     import tempfile
     from pathlib import Path
     import signal
     import atexit
     import hashlib
+    import gzip
     import re
+    import cProfile
+    import pstats
+    from contextlib import contextmanager
+    from collections import deque
+    from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
+    import queue
+    import bisect
+    import math
+    import operator
+    import copy
+    import random
+    import csv
+    import io
+    import socket
+    import ipaddress
+    from urllib.parse import urlparse
+    from concurrent.futures import ThreadPoolExecutor
     
     global flask_thread, flask_app
     
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler('run.log'),
-            logging.StreamHandler()
-        ]
+    # Logging: request threads only enqueue records, a listener thread does the I/O
+    LOG_FILE = os.environ.get('AXIS_LOG_FILE', 'run.log')
+    LOG_FORMAT = os.environ.get('AXIS_LOG_FORMAT', 'text').lower()
+    LOG_MAX_MB = float(os.environ.get('AXIS_LOG_MAX_MB', 10))
+    LOG_ROTATE_WHEN = os.environ.get('AXIS_LOG_ROTATE_WHEN', 'midnight')
+    LOG_BACKUPS = int(os.environ.get('AXIS_LOG_BACKUPS', 5))
+    LOG_LEVELS = dict(  # e.g. AXIS_LOG_LEVELS="werkzeug=INFO,urllib3=WARNING"
+        map(str.strip, item.split('=', 1)) for item in os.environ.get('AXIS_LOG_LEVELS', '').split(',') if '=' in item
     )
+
+    class RotatingLogHandler(RotatingFileHandler):
+        """Numbered backups, rolled over when the file reaches max_bytes or the when-interval elapses"""
+
+        def __init__(self, filename, max_bytes, when, backup_count):
+            super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8', delay=True)
+            self.timer = TimedRotatingFileHandler(filename, when=when, delay=True) if when else None
+
+        def shouldRollover(self, record):
+            if self.timer is not None and time.time() >= self.timer.rolloverAt:
+                return 1
+            return super().shouldRollover(record)
+
+        def doRollover(self):
+            super().doRollover()
+            if self.timer is not None:
+                self.timer.rolloverAt = self.timer.computeRollover(int(time.time()))
+
+    class JsonLineFormatter(logging.Formatter):
+        def format(self, record):
+            line = {
+                "ts": self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+                "level": record.levelname,
+                "logger": record.name,
+                "message": record.getMessage(),
+                "thread": record.threadName
+            }
+            for key in ("request_id", "route", "elapsed_ms"):
+                if getattr(record, key, None) is not None:
+                    line[key] = getattr(record, key)
+            exc = self.formatException(record.exc_info) if record.exc_info else record.exc_text
+            if exc:
+                line["exc"] = exc
+            return json.dumps(line, ensure_ascii=False)
+
+    class TracebackQueueHandler(QueueHandler):
+        """Like QueueHandler, but the traceback travels as exc_text instead of being merged into the message,
+        so each listener-side formatter lays it out itself"""
+
+        def prepare(self, record):
+            record = copy.copy(record)
+            record.message = record.msg = record.getMessage()
+            record.args = None
+            if record.exc_info and not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+            return record
+
+    def queued_handler(*handlers):
+        """QueueHandler feeding the given handlers from a background QueueListener"""
+        log_queue = queue.SimpleQueue()
+        listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
+        return TracebackQueueHandler(log_queue)
+
+    root_logger = logging.getLogger()
+    log_handler = next((h for h in root_logger.handlers if isinstance(h, QueueHandler)), None)
+    if log_handler is None:
+        if LOG_FORMAT == 'json':
+            log_formatter = JsonLineFormatter()
+        else:
+            log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+        outputs = [RotatingLogHandler(LOG_FILE, int(LOG_MAX_MB * 1024 * 1024), LOG_ROTATE_WHEN, LOG_BACKUPS)]
+        if sys.stderr is not None:
+            outputs.append(logging.StreamHandler())
+        for output in outputs:
+            output.setFormatter(log_formatter)
+        log_handler = queued_handler(*outputs)
+        root_logger.addHandler(log_handler)
+    root_logger.setLevel(os.environ.get('AXIS_LOG_LEVEL', 'INFO').upper())
+    for name, level in LOG_LEVELS.items():
+        logging.getLogger(name).setLevel(level.upper())
     logger = logging.getLogger(__name__)
 
     def is_frozen():
@@ -69,7 +162,7 @@ def start_my_app():
     install_libs()
 
     try:
-        from flask import Flask, request, jsonify, render_template_string
+        from flask import Flask, Response, g, has_request_context, request, jsonify, send_from_directory, stream_with_context
         import requests
         logger.info("All imports successful")
     except ImportError as e:
@@ -90,7 +183,34 @@ def start_my_app():
         CONFIG_FILE = "shop_config.json"
         logger.info(f"Script mode: Config stored in {CONFIG_FILE}")
 
-    flask_app = Flask(__name__)
+    # Serving settings (environment overrides)
+    SERVER_BACKEND = os.environ.get('AXIS_SERVER', 'werkzeug').lower()
+    SERVER_HOST = os.environ.get('AXIS_HOST', '127.0.0.1')
+    SERVER_PORT = int(os.environ.get('AXIS_PORT', 5000))
+    SERVER_THREADS = int(os.environ.get('AXIS_THREADS', 8))
+    SERVER_CONNECTION_LIMIT = int(os.environ.get('AXIS_CONNECTION_LIMIT', 100))
+    SERVER_MAX_BODY_MB = int(os.environ.get('AXIS_MAX_BODY_MB', 64))
+    OPEN_BROWSER = os.environ.get('AXIS_OPEN_BROWSER', '1') != '0'
+    GITHUB_API = os.environ.get('AXIS_GITHUB_API', 'https://api.github.com').rstrip('/')
+    APP_URL = f"http://{'127.0.0.1' if SERVER_HOST in ('0.0.0.0', '') else SERVER_HOST}:{SERVER_PORT}"
+
+    STATIC_DIR = os.path.join(get_base_path(), 'static')
+
+    flask_app = Flask(__name__, static_folder=STATIC_DIR)
+    flask_app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 31536000
+    flask_app.config['MAX_CONTENT_LENGTH'] = SERVER_MAX_BODY_MB * 1024 * 1024
+
+    def stamp_request(record):
+        """Attach request id, route and elapsed time while the record is still on the request thread"""
+        if has_request_context():
+            record.request_id = g.get('request_id')
+            record.route = request.endpoint
+            started = g.get('request_started')
+            if started is not None:
+                record.elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+        return True
+
+    log_handler.filters = [stamp_request]
 
     # Helper functions for file naming and deletion
     def clean_filename(text):
@@ -251,7 +371,7 @@ def start_my_app():
                 line-height: 1.5;
             }
         </style>
-        <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css">
+        <link rel="stylesheet" href="{{ vendor_url('fontawesome.css', 'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css') }}">
     </head>
     <body>
         <div class="setup-container">
@@ -351,9 +471,9 @@ def start_my_app():
         <meta charset="UTF-8">
         <meta name="viewport" content="width=device-width, initial-scale=1.0">
         <title>ProjectAxis Admin</title>
-        <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css" rel="stylesheet">
-        <link href="https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap" rel="stylesheet">
-        <script src="https://cdn.jsdelivr.net/npm/sweetalert2@11"></script>
+        <link href="{{ vendor_url('fontawesome.css', 'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css') }}" rel="stylesheet">
+        {% set inter_css = vendor_url('inter.css') %}{% if inter_css %}<link href="{{ inter_css }}" rel="stylesheet">{% endif %}
+        <script src="{{ vendor_url('sweetalert2.all.min.js', 'https://cdn.jsdelivr.net/npm/sweetalert2@11') }}"></script>
         <style>
             :root {
                 --primary: #2563eb;
@@ -1082,9 +1202,14 @@ def start_my_app():
             <div id="dashboard" class="section active">
                 <div class="header">
                     <h1 class="page-title">Dashboard</h1>
-                    <button class="btn btn-secondary" onclick="refreshData()">
-                        <i class="fas fa-sync-alt"></i> Refresh
-                    </button>
+                    <div style="display: flex; align-items: center; gap: 12px;">
+                        <span id="uploadStatus" style="color: #0369a1; font-size: 13px; display: none;"></span>
+                        <span id="queueStatus" style="color: #b45309; font-size: 13px; display: none;"></span>
+                        <span id="syncStatus" style="color: #64748b; font-size: 13px;"></span>
+                        <button class="btn btn-secondary" onclick="refreshData()">
+                            <i class="fas fa-sync-alt"></i> Refresh
+                        </button>
+                    </div>
                 </div>
                 
                 <div class="stats-grid">
@@ -1242,6 +1367,19 @@ def start_my_app():
                         </button>
                     </div>
                 </div>
+
+                <div class="card">
+                    <p style="color: var(--gray); margin-bottom: 12px;">
+                        Import a CSV or XLSX sheet with columns: title, price, category, offer, description, images (URLs or file names separated by |). Select the image files named in the sheet alongside it.
+                    </p>
+                    <div style="display: flex; gap: 8px; align-items: center;">
+                        <input type="file" id="importFile" accept=".csv,.xlsx" class="form-control">
+                        <input type="file" id="importImages" accept="image/*" multiple class="form-control">
+                        <button class="btn btn-primary" onclick="importSpreadsheet()">
+                            <i class="fas fa-file-import"></i> Import
+                        </button>
+                    </div>
+                </div>
             </div>
 
             <div id="categories" class="section" style="display:none;">
@@ -1297,6 +1435,17 @@ def start_my_app():
                             <tbody id="inventoryContainer"></tbody>
                         </table>
                     </div>
+                    <div id="inventoryPager" style="display: flex; justify-content: space-between; align-items: center; padding: 12px 16px;">
+                        <span id="inventoryPageInfo" style="font-size: 13px; color: var(--gray);"></span>
+                        <div style="display: flex; gap: 8px;">
+                            <button class="btn btn-secondary" id="inventoryPrev" onclick="changeInventoryPage(-1)">
+                                <i class="fas fa-chevron-left"></i>
+                            </button>
+                            <button class="btn btn-secondary" id="inventoryNext" onclick="changeInventoryPage(1)">
+                                <i class="fas fa-chevron-right"></i>
+                            </button>
+                        </div>
+                    </div>
                 </div>
             </div>
 
@@ -1369,6 +1518,7 @@ def start_my_app():
 
     <script>
         let products = [], categories = [], filteredProducts = [];
+        let inventoryPage = { q: '', offset: 0, limit: 50, total: 0 }; // Current server-side page of the inventory table
         let editingProductImages = []; // Stores existing image URLs
         let newProductImages = []; // Stores new image base64 strings
         let removedExistingImages = []; // Track removed existing images
@@ -1379,26 +1529,117 @@ def start_my_app():
 
         window.onload = function() {
             loadData();
+            setInterval(pollSync, 1500);
             // Setup floating button click handler
             document.getElementById('floatingAddBtn').onclick = addBulkRow;
         };
 
-        async function loadData() {
+        // Mutations carry an Idempotency-Key, so retrying after a dropped connection cannot apply them twice
+        async function sendMutation(url, options) {
+            const key = `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+            const request = Object.assign({}, options, {headers: Object.assign({}, options.headers, {'Idempotency-Key': key})});
+            for (let attempt = 1; ; attempt++) {
+                try {
+                    const res = await fetch(url, request);
+                    if (res.status < 500 || attempt >= 3) return res;
+                } catch (error) {
+                    if (attempt >= 3) throw error;
+                }
+                await new Promise(resolve => setTimeout(resolve, 500 * attempt));
+            }
+        }
+
+        let syncVersion = null;
+        let githubState = 'closed';
+
+        async function loadData(force) {
             try {
-                const res = await fetch('/api/get-data');
+                const res = await fetch(force ? '/api/get-data?refresh=1' : '/api/get-data');
                 const data = await res.json();
                 products = data.products || [];
-                filteredProducts = [...products];
                 categories = data.categories || [];
                 banners = data.banners || [];
                 whatsappNumber = data.whatsapp || '';
                 updateUI();
+                if (data.sync) {
+                    syncVersion = data.sync.version;
+                    showSyncStatus(data.sync);
+                }
             } catch (error) {
                 console.error('Failed to load data:', error);
                 Swal.fire('Error', 'Failed to load data', 'error');
             }
         }
 
+        function showQueueStatus(queue) {
+            const el = document.getElementById('queueStatus');
+            if (!el) return;
+            if (!queue || !queue.pending) {
+                el.style.display = 'none';
+                return;
+            }
+            let text = `${queue.pending} change${queue.pending === 1 ? '' : 's'} waiting to upload`;
+            if (queue.applied) text += `, ${queue.applied} done`;
+            if (queue.last_error) text += ' (GitHub unreachable, retrying)';
+            el.innerHTML = `<i class="fas fa-spinner fa-spin"></i> ${text}`;
+            el.title = (queue.items || []).map(item => item.title).join(', ');
+            el.style.display = 'inline';
+        }
+
+        function showUploadStatus(uploads) {
+            const el = document.getElementById('uploadStatus');
+            if (!el) return;
+            if (!uploads || (!uploads.active && !uploads.paused_for)) {
+                el.style.display = 'none';
+                return;
+            }
+            const rate = uploads.bytes_per_s >= 1048576
+                ? `${(uploads.bytes_per_s / 1048576).toFixed(1)} MB/s`
+                : `${Math.round(uploads.bytes_per_s / 1024)} KB/s`;
+            el.innerHTML = uploads.paused_for
+                ? `<i class="fas fa-info-circle"></i> GitHub asked to slow down, uploads resume in ${Math.ceil(uploads.paused_for)}s`
+                : `<i class="fas fa-spinner fa-spin"></i> Uploading images: ${uploads.active} at a time (limit ${Math.floor(uploads.concurrency)}), ${rate}`;
+            el.style.display = 'inline';
+        }
+
+        function showSyncStatus(sync) {
+            const el = document.getElementById('syncStatus');
+            if (!el || !sync) return;
+            showQueueStatus(sync.queue);
+            showUploadStatus(sync.uploads);
+            const when = sync.synced ? new Date(sync.synced * 1000).toLocaleTimeString() : 'never';
+            const github = sync.github || {};
+            if (github.state && github.state !== 'closed') {
+                const retry = github.retry_at ? new Date(github.retry_at * 1000).toLocaleTimeString() : 'soon';
+                el.innerHTML = `<i class="fas fa-info-circle" style="color: #ef4444;"></i> GitHub unavailable, checking again at ${retry}. Showing saved copy from ${when}`;
+                el.title = `Changes to products are saved offline and upload once GitHub recovers (${github.last_error || 'no response'})`;
+            } else if (sync.refreshing) {
+                el.innerHTML = '<i class="fas fa-sync-alt fa-spin"></i> Refreshing…';
+            } else if (sync.error) {
+                el.innerHTML = `<i class="fas fa-info-circle" style="color: #f59e0b;"></i> Showing saved copy, last synced ${when}`;
+                el.title = sync.error;
+            } else {
+                el.innerHTML = `<i class="fas fa-check" style="color: #10b981;"></i> Last synced ${when}`;
+                el.title = '';
+            }
+        }
+
+        async function pollSync() {
+            try {
+                const res = await fetch('/api/sync-status');
+                const sync = await res.json();
+                if (!sync.version) return;
+                showSyncStatus(sync);
+                const recovered = githubState !== 'closed' && sync.github && sync.github.state === 'closed';
+                githubState = sync.github ? sync.github.state : 'closed';
+                if (recovered || (syncVersion && sync.version !== syncVersion && !sync.refreshing)) {
+                    await loadData();
+                }
+            } catch (error) {
+                console.error('Failed to check sync status:', error);
+            }
+        }
+
         function updateUI() {
             document.getElementById('totalProds').innerText = products.length;
             document.getElementById('totalCats').innerText = categories.length;
@@ -1439,17 +1680,35 @@ def start_my_app():
             }
         }
 
-        function renderProductTable(searchTerm = '') {
+        async function renderProductTable(searchTerm) {
             const container = document.getElementById('inventoryContainer');
-            let itemsToRender = filteredProducts;
+            if (searchTerm !== undefined && searchTerm !== inventoryPage.q) {
+                inventoryPage.q = searchTerm;
+                inventoryPage.offset = 0;
+            }
             
-            if (searchTerm) {
-                itemsToRender = filteredProducts.filter(p => 
-                    (p.title && p.title.toLowerCase().includes(searchTerm.toLowerCase())) ||
-                    (p.category && p.category.toLowerCase().includes(searchTerm.toLowerCase())) ||
-                    (p.description && p.description.toLowerCase().includes(searchTerm.toLowerCase()))
-                );
+            let itemsToRender = [];
+            try {
+                const params = new URLSearchParams({
+                    q: inventoryPage.q,
+                    cursor: inventoryPage.offset,
+                    limit: inventoryPage.limit
+                });
+                const res = await fetch('/api/products?' + params);
+                const data = await res.json();
+                // A newer search or page change has been issued since; its response will render instead
+                if (params.get('q') !== inventoryPage.q || Number(params.get('cursor')) !== inventoryPage.offset) return;
+                itemsToRender = data.items || [];
+                inventoryPage.total = data.total || 0;
+                if (!itemsToRender.length && inventoryPage.offset > 0 && inventoryPage.total > 0) {
+                    inventoryPage.offset = Math.floor((inventoryPage.total - 1) / inventoryPage.limit) * inventoryPage.limit;
+                    return renderProductTable();
+                }
+            } catch (error) {
+                console.error('Failed to load products page:', error);
             }
+            filteredProducts = itemsToRender;
+            updateInventoryPager();
             
             if (itemsToRender.length === 0) {
                 container.innerHTML = `
@@ -1464,7 +1723,7 @@ def start_my_app():
             }
             
             container.innerHTML = itemsToRender.map((p, i) => {
-                const originalIndex = products.findIndex(prod => prod.id === p.id);
+                const originalIndex = p.index;
                 const isSelected = selectedProducts.has(originalIndex);
                 return `
                     <tr>
@@ -1512,6 +1771,22 @@ def start_my_app():
             updateDeleteSelectedButton();
         }
 
+        function updateInventoryPager() {
+            const { offset, limit, total } = inventoryPage;
+            document.getElementById('inventoryPageInfo').innerText = total
+                ? `${offset + 1}–${Math.min(offset + limit, total)} of ${total}`
+                : '';
+            document.getElementById('inventoryPrev').disabled = offset === 0;
+            document.getElementById('inventoryNext').disabled = offset + limit >= total;
+        }
+
+        function changeInventoryPage(direction) {
+            const next = inventoryPage.offset + direction * inventoryPage.limit;
+            if (next < 0 || next >= inventoryPage.total) return;
+            inventoryPage.offset = next;
+            renderProductTable();
+        }
+
         // --- MULTIPLE SELECTION FUNCTIONS ---
         function toggleProductSelection(index, checkbox) {
             if (checkbox.checked) {
@@ -1529,12 +1804,7 @@ def start_my_app():
             
             if (checkbox.checked) {
                 // Select all visible products
-                filteredProducts.forEach((p, i) => {
-                    const originalIndex = products.findIndex(prod => prod.id === p.id);
-                    if (originalIndex !== -1) {
-                        selectedProducts.add(originalIndex);
-                    }
-                });
+                filteredProducts.forEach(p => selectedProducts.add(p.index));
                 allCheckboxes.forEach(cb => cb.checked = true);
             } else {
                 // Deselect all
@@ -1618,10 +1888,10 @@ def start_my_app():
                 for (const index of indices) {
                     await updateDeletionProgress(Math.round((completed / total) * 100));
                     
-                    const res = await fetch('/api/delete', {
+                    const res = await sendMutation('/api/delete', {
                         method: 'POST',
                         headers: {'Content-Type': 'application/json'},
-                        body: JSON.stringify({index: index})
+                        body: JSON.stringify({index: index, id: products[index] ? products[index].id : undefined})
                     });
                     
                     if (!res.ok) {
@@ -1676,10 +1946,10 @@ def start_my_app():
             try {
                 await updateDeletionProgress(30);
                 
-                const res = await fetch('/api/delete', {
+                const res = await sendMutation('/api/delete', {
                     method: 'POST',
                     headers: {'Content-Type': 'application/json'},
-                    body: JSON.stringify({index: index})
+                    body: JSON.stringify({index: index, id: products[index] ? products[index].id : undefined})
                 });
                 
                 await updateDeletionProgress(70);
@@ -1732,10 +2002,10 @@ def start_my_app():
             try {
                 await updateDeletionProgress(30);
                 
-                const res = await fetch('/api/delete-banner', {
+                const res = await sendMutation('/api/delete-banner', {
                     method: 'POST',
                     headers: {'Content-Type': 'application/json'},
-                    body: JSON.stringify({index: index})
+                    body: JSON.stringify({index: index, image: banners[index] ? banners[index].image : undefined})
                 });
                 
                 await updateDeletionProgress(70);
@@ -1903,6 +2173,7 @@ def start_my_app():
                 // For new: just new images
                 const payload = {
                     editIndex: editIndex,
+                    editId: editIndex > -1 && products[editIndex] ? products[editIndex].id : null,
                     product: {
                         title: title,
                         price: parseFloat(price),
@@ -1918,7 +2189,7 @@ def start_my_app():
                 progressBar.style.width = '50%';
                 progressText.textContent = '50% - Processing...';
                 
-                const res = await fetch('/api/upload', {
+                const res = await sendMutation('/api/upload', {
                     method: 'POST',
                     headers: {'Content-Type': 'application/json'},
                     body: JSON.stringify(payload)
@@ -1926,7 +2197,19 @@ def start_my_app():
                 
                 const result = await res.json();
                 
-                if (result.success) {
+                if (result.success && result.queued) {
+                    progressBar.style.width = '100%';
+                    progressText.textContent = '100% - Saved offline';
+                    
+                    await Swal.fire({
+                        icon: 'info',
+                        title: 'Saved Offline',
+                        text: `GitHub is unreachable. This change will upload automatically (${result.pending} waiting).`
+                    });
+                    
+                    loadData();
+                    resetForm();
+                } else if (result.success) {
                     progressBar.style.width = '100%';
                     progressText.textContent = '100% - Complete!';
                     
@@ -2246,6 +2529,7 @@ def start_my_app():
             
             try {
                 let completed = 0;
+                let queued = 0;
                 const total = rows.length;
                 
                 for (let row of rows) {
@@ -2268,7 +2552,7 @@ def start_my_app():
                         }
                     };
                     
-                    const res = await fetch('/api/upload-bulk', {
+                    const res = await sendMutation('/api/upload-bulk', {
                         method: 'POST',
                         headers: {'Content-Type': 'application/json'},
                         body: JSON.stringify(payload)
@@ -2277,6 +2561,8 @@ def start_my_app():
                     if (!res.ok) {
                         throw new Error('Failed to upload product');
                     }
+                    const result = await res.json();
+                    if (result.queued) queued++;
                     
                     completed++;
                     await updateDeletionProgress(Math.round((completed / total) * 100));
@@ -2290,7 +2576,9 @@ def start_my_app():
                 Swal.fire({
                     icon: 'success',
                     title: 'Bulk Upload Complete!',
-                    text: `${total} products have been uploaded successfully.`,
+                    text: queued
+                        ? `${total - queued} products uploaded, ${queued} saved offline and will upload when GitHub is reachable.`
+                        : `${total} products have been uploaded successfully.`,
                     timer: 2000,
                     showConfirmButton: false
                 });
@@ -2307,6 +2595,43 @@ def start_my_app():
         }
 
         // --- BANNER FUNCTIONS ---
+        async function importSpreadsheet() {
+            const file = document.getElementById('importFile').files[0];
+            if (!file) {
+                Swal.fire('No File', 'Choose a CSV or XLSX file to import', 'warning');
+                return;
+            }
+            
+            await showDeletingOverlay('Importing Products', `Importing ${file.name}...`);
+            try {
+                const form = new FormData();
+                form.append('file', file);
+                for (const image of document.getElementById('importImages').files) {
+                    form.append('images', image);
+                }
+                const res = await sendMutation('/api/import', { method: 'POST', body: form });
+                const result = await res.json();
+                await hideDeletingOverlay();
+                
+                const errors = result.errors || [];
+                const errorList = errors.slice(0, 20).map(e => `<li>${e.row ? 'Row ' + e.row + ': ' : ''}${e.error}</li>`).join('');
+                Swal.fire({
+                    icon: result.success && !errors.length ? 'success' : (result.imported ? 'warning' : 'error'),
+                    title: `Imported ${result.imported || 0} products`,
+                    html: result.error || (errors.length
+                        ? `<p>${errors.length} rows rejected</p><ul style="text-align: left; max-height: 200px; overflow: auto;">${errorList}</ul>`
+                        : '')
+                });
+                document.getElementById('importFile').value = '';
+                document.getElementById('importImages').value = '';
+                loadData();
+            } catch (error) {
+                await hideDeletingOverlay();
+                console.error('Import error:', error);
+                Swal.fire('Import Failed', 'Failed to import products', 'error');
+            }
+        }
+
         function previewBannerImage() {
             const file = document.getElementById('bannerFile').files[0];
             const preview = document.getElementById('bannerPreview');
@@ -2353,7 +2678,7 @@ def start_my_app():
                 
                 await updateDeletionProgress(30);
                 
-                const res = await fetch('/api/upload-banner', {
+                const res = await sendMutation('/api/upload-banner', {
                     method: 'POST',
                     headers: {'Content-Type': 'application/json'},
                     body: JSON.stringify(payload)
@@ -2438,7 +2763,7 @@ def start_my_app():
             try {
                 categories.push(val);
                 
-                await fetch('/api/update-cats', {
+                await sendMutation('/api/update-cats', {
                     method: 'POST',
                     headers: {'Content-Type': 'application/json'},
                     body: JSON.stringify({categories: categories})
@@ -2476,7 +2801,7 @@ def start_my_app():
             try {
                 categories.splice(index, 1);
                 
-                await fetch('/api/update-cats', {
+                await sendMutation('/api/update-cats', {
                     method: 'POST',
                     headers: {'Content-Type': 'application/json'},
                     body: JSON.stringify({categories: categories})
@@ -2492,10 +2817,20 @@ def start_my_app():
         }
 
         function searchProducts() {
+            clearTimeout(searchTimer);
             const searchTerm = document.getElementById('searchInput').value.trim();
             renderProductTable(searchTerm);
         }
 
+        // Search as you type, once typing pauses
+        let searchTimer = null;
+        document.addEventListener('DOMContentLoaded', function() {
+            document.getElementById('searchInput').addEventListener('input', function() {
+                clearTimeout(searchTimer);
+                searchTimer = setTimeout(searchProducts, 250);
+            });
+        });
+
         // --- STORE SETTINGS ---
         async function saveSettings() {
             const whatsapp = document.getElementById('storeWhatsapp').value.trim();
@@ -2515,7 +2850,7 @@ def start_my_app():
             btn.disabled = true;
             
             try {
-                const res = await fetch('/api/update-settings', {
+                const res = await sendMutation('/api/update-settings', {
                     method: 'POST',
                     headers: {'Content-Type': 'application/json'},
                     body: JSON.stringify({ whatsappNumber: whatsapp })
@@ -2574,7 +2909,7 @@ def start_my_app():
         }
 
         function refreshData() {
-            loadData();
+            loadData(true);
             Swal.fire({
                 title: 'Refreshing...',
                 timer: 1000,
@@ -2625,22 +2960,654 @@ def start_my_app():
     </html>
     """
 
+    # Hot-path metrics: per-route latency, GitHub call budget, caches and jobs
+    LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+    metrics_lock = threading.Lock()
+    route_metrics = {}
+    github_metrics = {}
+    cache_metrics = {}
+    job_metrics = {}
+    rate_limit = {"limit": None, "remaining": None, "reset": None}
+
+    def new_route_metric():
+        return {"count": 0, "errors": 0, "seconds": 0.0, "buckets": [0] * len(LATENCY_BUCKETS),
+                "bytes_in": 0, "bytes_out": 0, "in_flight": 0}
+
+    def cache_event(name, hit):
+        with metrics_lock:
+            entry = cache_metrics.setdefault(name, {"hits": 0, "misses": 0})
+            entry["hits" if hit else "misses"] += 1
+
+    @contextmanager
+    def track_job(name):
+        """Count in-flight background work by name"""
+        with metrics_lock:
+            job_metrics[name] = job_metrics.get(name, 0) + 1
+        try:
+            yield
+        finally:
+            with metrics_lock:
+                job_metrics[name] -= 1
+
+    operation_local = threading.local()
+
+    def current_operation():
+        bound = getattr(operation_local, 'name', None)
+        if bound:
+            return bound
+        return (request.endpoint or "unmatched") if has_request_context() else "background"
+
+    def bind_operation(fn):
+        """Wrap fn so work it does on a worker thread counts toward, and traces under, the calling route"""
+        operation = current_operation()
+        parent = current_span()
+
+        def run(*args, **kwargs):
+            operation_local.name = operation
+            trace_local.stack = [parent] if parent else []
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                operation_local.name = None
+                trace_local.stack = []
+        return run
+
+    def observe_github(res, elapsed):
+        """Called by github_api() for every GitHub request"""
+        operation = current_operation()
+        with metrics_lock:
+            entry = github_metrics.setdefault(operation, {"calls": 0, "errors": 0, "seconds": 0.0,
+                                                          "bytes_sent": 0, "bytes_received": 0})
+            entry["calls"] += 1
+            entry["seconds"] += elapsed
+            if res is None or res.status_code >= 400:
+                entry["errors"] += 1
+            if res is not None:
+                sent = getattr(res, 'request', None)
+                body = sent.body if sent is not None else None
+                entry["bytes_sent"] += len(body) if body else 0
+                entry["bytes_received"] += len(res.content or b'')
+                if 'X-RateLimit-Remaining' in res.headers:
+                    rate_limit.update(
+                        limit=int(res.headers.get('X-RateLimit-Limit', 0)),
+                        remaining=int(res.headers['X-RateLimit-Remaining']),
+                        reset=int(res.headers.get('X-RateLimit-Reset', 0))
+                    )
+
+    @flask_app.before_request
+    def start_request_metrics():
+        g.request_started = time.perf_counter()
+        g.request_id = request.headers.get('X-Request-ID') or os.urandom(8).hex()
+        with metrics_lock:
+            route_metrics.setdefault(request.endpoint or "unmatched", new_route_metric())["in_flight"] += 1
+
+    @flask_app.after_request
+    def record_request_metrics(response):
+        """Registered before the compression hook so it runs after it and sees bytes on the wire"""
+        started = g.pop('request_started', None)
+        if started is None:
+            return response
+        response.headers['X-Request-ID'] = g.request_id
+        elapsed = time.perf_counter() - started
+        with metrics_lock:
+            entry = route_metrics[request.endpoint or "unmatched"]
+            entry["in_flight"] -= 1
+            entry["count"] += 1
+            entry["seconds"] += elapsed
+            bucket = bisect.bisect_left(LATENCY_BUCKETS, elapsed)
+            if bucket < len(LATENCY_BUCKETS):
+                entry["buckets"][bucket] += 1
+            if response.status_code >= 400:
+                entry["errors"] += 1
+            entry["bytes_in"] += request.content_length or 0
+            entry["bytes_out"] += response.content_length or 0
+        return response
+
+    def metrics_snapshot():
+        with metrics_lock:
+            with compression_lock:
+                return {
+                    "routes": {k: dict(v, buckets=[[bound, n] for bound, n in zip(LATENCY_BUCKETS, v["buckets"])])
+                               for k, v in route_metrics.items()},
+                    "github": {k: dict(v) for k, v in github_metrics.items()},
+                    "rate_limit": dict(rate_limit),
+                    "caches": {k: dict(v, ratio=round(v["hits"] / max(v["hits"] + v["misses"], 1), 3))
+                               for k, v in cache_metrics.items()},
+                    "jobs": dict(job_metrics),
+                    "compression": dict(compression_stats),
+                    "github_breaker": breaker_status(),
+                    "uploads": upload_status()
+                }
+
+    def prometheus_text(snap):
+        """Render a metrics snapshot in the Prometheus text exposition format"""
+        lines = []
+
+        def metric(name, kind, samples):
+            lines.append(f"# TYPE axis_{name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                lines.append(f"axis_{name}{{{label_text}}} {value}" if label_text else f"axis_{name} {value}")
+
+        routes = snap["routes"]
+        lines.append("# TYPE axis_http_request_duration_seconds histogram")
+        for route, m in routes.items():
+            total = 0
+            for bound, count in m["buckets"]:
+                total += count
+                lines.append(f'axis_http_request_duration_seconds_bucket{{route="{route}",le="{bound}"}} {total}')
+            lines.append(f'axis_http_request_duration_seconds_bucket{{route="{route}",le="+Inf"}} {m["count"]}')
+            lines.append(f'axis_http_request_duration_seconds_sum{{route="{route}"}} {round(m["seconds"], 6)}')
+            lines.append(f'axis_http_request_duration_seconds_count{{route="{route}"}} {m["count"]}')
+        metric("http_request_errors_total", "counter", [({"route": r}, m["errors"]) for r, m in routes.items()])
+        metric("http_requests_in_flight", "gauge", [({"route": r}, m["in_flight"]) for r, m in routes.items()])
+        metric("http_request_bytes_total", "counter", [({"route": r}, m["bytes_in"]) for r, m in routes.items()])
+        metric("http_response_bytes_total", "counter", [({"route": r}, m["bytes_out"]) for r, m in routes.items()])
+        for key in ("calls", "errors", "bytes_sent", "bytes_received"):
+            metric(f"github_{key}_total", "counter", [({"operation": op}, m[key]) for op, m in snap["github"].items()])
+        metric("github_seconds_total", "counter", [({"operation": op}, round(m["seconds"], 6)) for op, m in snap["github"].items()])
+        for key in ("limit", "remaining", "reset"):
+            if snap["rate_limit"][key] is not None:
+                metric(f"github_ratelimit_{key}", "gauge", [({}, snap["rate_limit"][key])])
+        metric("cache_hits_total", "counter", [({"cache": c}, m["hits"]) for c, m in snap["caches"].items()])
+        metric("cache_misses_total", "counter", [({"cache": c}, m["misses"]) for c, m in snap["caches"].items()])
+        metric("jobs_in_flight", "gauge", [({"job": j}, n) for j, n in snap["jobs"].items()])
+        gb = snap["github_breaker"]
+        metric("github_breaker_state", "gauge",
+               [({"state": st}, int(gb["state"] == st)) for st in ("closed", "open", "half_open")])
+        metric("github_breaker_trips_total", "counter", [({}, gb["trips"])])
+        metric("github_breaker_short_circuited_total", "counter", [({}, gb["short_circuited"])])
+        up = snap["uploads"]
+        metric("upload_concurrency_limit", "gauge", [({}, up["concurrency"])])
+        metric("upload_active", "gauge", [({}, up["active"])])
+        metric("upload_images_total", "counter", [({}, up["uploaded"])])
+        metric("upload_bytes_total", "counter", [({}, up["bytes"])])
+        metric("upload_throttled_total", "counter", [({}, up["throttled"])])
+        metric("upload_bytes_per_second", "gauge", [({}, up["bytes_per_s"])])
+        comp = snap["compression"]
+        metric("compression_responses_total", "counter", [({}, comp["responses"])])
+        metric("compression_bytes_in_total", "counter", [({}, comp["bytes_in"])])
+        metric("compression_bytes_out_total", "counter", [({}, comp["bytes_out"])])
+        metric("compression_seconds_total", "counter", [({}, round(comp["encode_seconds"], 6))])
+        return "\n".join(lines) + "\n"
+
+    # Nested span tracing: request -> step -> GitHub call
+    TRACE_FILE = os.path.join(os.path.dirname(os.path.abspath(CONFIG_FILE)), 'traces.jsonl')
+    TRACE_SKIP = {"static", "asset", "metrics", "traces", "sync_state", None}
+    recent_traces = deque(maxlen=200)
+    trace_local = threading.local()
+    trace_logger = logging.getLogger('axis.traces')
+    trace_logger.propagate = False
+    trace_logger.setLevel(logging.INFO)
+    if not trace_logger.handlers:
+        trace_handler = RotatingFileHandler(TRACE_FILE, maxBytes=5 * 1024 * 1024, backupCount=3, delay=True)
+        trace_handler.setFormatter(logging.Formatter('%(message)s'))
+        trace_logger.addHandler(queued_handler(trace_handler))
+
+    def current_span():
+        stack = getattr(trace_local, 'stack', None)
+        return stack[-1] if stack else None
+
+    def new_span(name, attrs):
+        return {"name": name, "start": int(time.time()*1000), "ms": None, "attrs": attrs, "children": []}
+
+    @contextmanager
+    def span(name, **attrs):
+        """Child span of whatever is running on this thread; a no-op outside a traced request"""
+        parent = current_span()
+        if parent is None:
+            yield None
+            return
+        node = new_span(name, attrs)
+        parent["children"].append(node)
+        trace_local.stack.append(node)
+        start = time.perf_counter()
+        try:
+            yield node
+        except Exception as e:
+            node["attrs"]["error"] = str(e)
+            raise
+        finally:
+            node["ms"] = round((time.perf_counter() - start) * 1000, 2)
+            trace_local.stack.pop()
+
+    @flask_app.before_request
+    def start_trace():
+        if request.endpoint in TRACE_SKIP:
+            return
+        root = new_span(request.endpoint, {"method": request.method, "bytes_in": request.content_length or 0})
+        root["trace_id"] = g.request_id
+        g.trace = (root, time.perf_counter())
+        trace_local.stack = [root]
+
+    @flask_app.after_request
+    def finish_trace(response):
+        trace = g.pop('trace', None)
+        trace_local.stack = []
+        if trace is None:
+            return response
+        root, start = trace
+        root["ms"] = round((time.perf_counter() - start) * 1000, 2)
+        root["attrs"].update(status=response.status_code, bytes_out=response.content_length)
+        recent_traces.append(root)
+        try:
+            trace_logger.info(json.dumps(root, separators=(',', ':')))
+        except Exception as e:
+            logger.error(f"Trace write error: {e}")
+        return response
+
+    @flask_app.teardown_request
+    def drop_trace(exc):
+        trace_local.stack = []
+
+    # Opt-in session recorder: sanitized request shapes for benchmarks/replay.py
+    RECORD_TARGET = os.environ.get('AXIS_RECORD', '')
+    RECORD_SKIP = TRACE_SKIP | {"home", "profile", "profile_file"}
+    IMAGE_FIELDS = {"newImages", "image"}
+    PLAIN_QUERY_ARGS = {"sort", "cursor", "limit", "format", "since"}
+    record_logger = logging.getLogger('axis.recorder')
+    record_logger.propagate = False
+    record_logger.setLevel(logging.INFO)
+    if RECORD_TARGET and not record_logger.handlers:
+        if RECORD_TARGET == '1':
+            RECORD_TARGET = os.path.join(os.path.dirname(os.path.abspath(CONFIG_FILE)), 'recordings',
+                                         time.strftime('session-%Y%m%d-%H%M%S.jsonl'))
+        os.makedirs(os.path.dirname(os.path.abspath(RECORD_TARGET)), exist_ok=True)
+        record_handler = RotatingFileHandler(RECORD_TARGET, maxBytes=50 * 1024 * 1024, backupCount=2)
+        record_handler.setFormatter(logging.Formatter('%(message)s'))
+        record_logger.addHandler(queued_handler(record_handler))
+        logger.info(f"Recording API requests to {RECORD_TARGET}")
+
+    def body_shape(value, key=None):
+        """Request body with every string replaced by its size; images become decoded byte counts"""
+        if isinstance(value, dict):
+            return {k: body_shape(v, k) for k, v in value.items()}
+        if isinstance(value, list):
+            return [body_shape(v, key) for v in value]
+        if isinstance(value, str):
+            if key in IMAGE_FIELDS or len(value) > 4096:
+                return {"image": len(value) * 3 // 4}
+            return {"str": len(value)}
+        return value
+
+    def upload_shape(files):
+        shapes = {}
+        for name, f in files.items():
+            f.stream.seek(0, os.SEEK_END)
+            shapes[name] = {"bytes": f.stream.tell(), "ext": os.path.splitext(f.filename or '')[1].lower()}
+            f.stream.seek(0)
+        return shapes
+
+    @flask_app.before_request
+    def start_recording():
+        """Shapes are taken up front, before the route consumes uploaded file streams"""
+        if not record_logger.handlers or request.endpoint in RECORD_SKIP:
+            return
+        try:
+            entry = {
+                "t": round(time.time(), 3),
+                "method": request.method,
+                "path": request.path,
+                "route": request.endpoint,
+                "query": {k: v if k in PLAIN_QUERY_ARGS else body_shape(v) for k, v in request.args.items()}
+            }
+            if request.endpoint == 'setup':
+                entry["body"] = None
+            elif request.files:
+                entry["files"] = upload_shape(request.files)
+                entry["form"] = body_shape(request.form.to_dict())
+            else:
+                entry["body"] = body_shape(request.get_json(silent=True))
+            g.recording = entry
+        except Exception as e:
+            logger.error(f"Recorder error: {e}")
+
+    @flask_app.after_request
+    def record_request(response):
+        entry = g.pop('recording', None)
+        if entry is None:
+            return response
+        entry.update(status=response.status_code, ms=round((time.time() - entry["t"]) * 1000, 2),
+                     bytes_out=response.content_length)
+        record_logger.info(json.dumps(entry, separators=(',', ':')))
+        return response
+
+    # On-demand profiling of selected requests (off unless armed)
+    PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(CONFIG_FILE)), 'profiles')
+    PROFILE_MODES = ("cprofile", "sample")
+    SAMPLE_INTERVAL = 0.005
+    profile_plan = {}
+    profile_lock = threading.Lock()
+
+    def is_local_request():
+        return request.remote_addr in ('127.0.0.1', '::1', None)
+
+    def requested_profile_mode():
+        """Mode to profile this request with: armed for its route, or X-Profile / ?profile= from this machine.
+
+        For cprofile the caller holds profile_lock on return; cProfile allows one active profiler per process,
+        so while another request holds it this one is not profiled and an armed count is not used up."""
+        if not profile_plan and 'X-Profile' not in request.headers and 'profile' not in request.args:
+            return None
+        if not is_local_request():
+            return None
+        flag = request.headers.get('X-Profile') or request.args.get('profile')
+        if flag:
+            mode = "cprofile" if flag == '1' else flag if flag in PROFILE_MODES else None
+            if mode == "cprofile" and not profile_lock.acquire(blocking=False):
+                return None
+            return mode
+        with metrics_lock:
+            plan = profile_plan.get(request.endpoint)
+            if not plan:
+                return None
+            if plan["mode"] == "cprofile" and not profile_lock.acquire(blocking=False):
+                return None
+            plan["count"] -= 1
+            if plan["count"] <= 0:
+                del profile_plan[request.endpoint]
+            return plan["mode"]
+
+    def start_sampler(thread_id):
+        """Sample one thread's stack every SAMPLE_INTERVAL; catches time spent waiting on I/O too"""
+        state = {"stacks": {}, "stop": threading.Event()}
+
+        def run():
+            while not state["stop"].wait(SAMPLE_INTERVAL):
+                frame = sys._current_frames().get(thread_id)
+                names = []
+                while frame is not None:
+                    code = frame.f_code
+                    names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                if names:
+                    key = ";".join(reversed(names))
+                    state["stacks"][key] = state["stacks"].get(key, 0) + 1
+
+        state["thread"] = Thread(target=run, daemon=True)
+        state["thread"].start()
+        return state
+
+    @flask_app.before_request
+    def start_profile():
+        mode = requested_profile_mode()
+        if mode == "sample":
+            g.sampler = start_sampler(threading.get_ident())
+        elif mode == "cprofile":
+            g.profiler = cProfile.Profile()
+            g.profiler.enable()
+
+    @flask_app.after_request
+    def stop_profile(response):
+        profiler = g.pop('profiler', None)
+        sampler = g.pop('sampler', None)
+        if profiler is None and sampler is None:
+            return response
+        try:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            stem = f"{int(time.time()*1000)}_{request.endpoint or 'unmatched'}"
+            if profiler is not None:
+                profiler.disable()
+                name = f"{stem}.prof"
+                profiler.dump_stats(os.path.join(PROFILE_DIR, name))
+            else:
+                sampler["stop"].set()
+                sampler["thread"].join()
+                name = f"{stem}.folded"
+                with open(os.path.join(PROFILE_DIR, name), 'w') as f:
+                    for stack, count in sorted(sampler["stacks"].items()):
+                        f.write(f"{stack} {count}\n")
+            response.headers['X-Profile-File'] = name
+            logger.info(f"Saved profile {name}")
+        except Exception as e:
+            logger.error(f"Profile save error: {e}")
+        finally:
+            if profiler is not None:
+                profile_lock.release()
+        return response
+
+    @flask_app.teardown_request
+    def abandon_profile(exc):
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profiler.disable()
+            profile_lock.release()
+        sampler = g.pop('sampler', None)
+        if sampler is not None:
+            sampler["stop"].set()
+
+    def folded_summary(path, top):
+        """Top-N innermost frames by sample count"""
+        own, total = {}, 0
+        with open(path) as f:
+            for line in f:
+                stack, _, count = line.rstrip('\n').rpartition(' ')
+                leaf = stack.rsplit(';', 1)[-1]
+                own[leaf] = own.get(leaf, 0) + int(count)
+                total += int(count)
+        lines = [f"{total} samples every {SAMPLE_INTERVAL * 1000:.0f} ms", ""]
+        for leaf, count in sorted(own.items(), key=lambda kv: -kv[1])[:top]:
+            lines.append(f"{count:>7} {count * 100 / max(total, 1):5.1f}%  {leaf}")
+        return "\n".join(lines) + "\n"
+
+    # Shop configuration, loaded once and re-read only when the file changes
+    CONFIG_CHECK_INTERVAL = 1.0
+    config_state = {"stamp": None, "checked": 0.0, "conf": None, "session": None}
+    config_lock = threading.Lock()
+
+    def config_stamp():
+        try:
+            st = os.stat(CONFIG_FILE)
+            return (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            return None
+
+    def apply_config(conf, stamp):
+        """Swap in a new config; per-repo client and caches are dropped only if repo/token changed"""
+        old = config_state["conf"] or {}
+        new = conf or {}
+        if (old.get('repo'), old.get('token')) != (new.get('repo'), new.get('token')):
+            if config_state["session"] is not None:
+                config_state["session"].close()
+            config_state["session"] = None
+            catalog_cache.clear()
+            search_index_cache.clear()
+            logger.info("Repository settings changed, GitHub client and caches reset")
+        config_state.update(conf=conf, stamp=stamp, checked=time.monotonic())
+
+    def get_config():
+        """Current config dict, or None before setup"""
+        with config_lock:
+            if time.monotonic() - config_state["checked"] < CONFIG_CHECK_INTERVAL:
+                cache_event("config", True)
+                return config_state["conf"]
+            stamp = config_stamp()
+            if stamp == config_state["stamp"]:
+                config_state["checked"] = time.monotonic()
+                cache_event("config", True)
+                return config_state["conf"]
+            cache_event("config", False)
+            conf = None
+            if stamp:
+                try:
+                    with open(CONFIG_FILE, 'r') as f:
+                        conf = json.load(f)
+                except Exception as e:
+                    logger.error(f"Error reading config: {e}")
+            apply_config(conf, stamp)
+            return conf
+
+    def require_config():
+        conf = get_config()
+        if not conf:
+            raise RuntimeError("App is not configured")
+        return conf
+
+    def save_config(conf):
+        with config_lock:
+            with open(CONFIG_FILE, 'w') as f:
+                json.dump(conf, f, indent=2)
+            apply_config(conf, config_stamp())
+
+    def clear_config():
+        with config_lock:
+            if os.path.exists(CONFIG_FILE):
+                os.remove(CONFIG_FILE)
+            apply_config(None, None)
+
+    def github_session():
+        """Pooled keep-alive connection to the GitHub API for the configured repo"""
+        with config_lock:
+            if config_state["session"] is None:
+                config_state["session"] = requests.Session()
+            return config_state["session"]
+
+    # Circuit breaker: after repeated GitHub failures stop calling it and fail fast until a probe gets through
+    BREAKER_FAILURES = int(os.environ.get('AXIS_BREAKER_FAILURES', 5))
+    BREAKER_COOLDOWN = float(os.environ.get('AXIS_BREAKER_COOLDOWN', 15))
+    BREAKER_COOLDOWN_MAX = float(os.environ.get('AXIS_BREAKER_COOLDOWN_MAX', 300))
+    breaker = {"state": "closed", "failures": 0, "cooldown": BREAKER_COOLDOWN, "opened_at": None, "retry_at": None,
+               "probing": False, "trips": 0, "short_circuited": 0, "last_error": None}
+    breaker_lock = threading.Lock()
+
+    def breaker_admit():
+        """(allowed, probe): closed lets everything through; open lets one probe through once the cooldown is over"""
+        with breaker_lock:
+            if breaker["state"] == "closed":
+                return True, False
+            if not breaker["probing"] and time.time() >= breaker["retry_at"]:
+                breaker.update(state="half_open", probing=True)
+                return True, True
+            breaker["short_circuited"] += 1
+            return False, False
+
+    def breaker_record(ok, probe, error=None):
+        with breaker_lock:
+            if ok:
+                if breaker["state"] != "closed":
+                    logger.info("GitHub is answering again, closing the circuit breaker")
+                breaker.update(state="closed", failures=0, cooldown=BREAKER_COOLDOWN, opened_at=None,
+                               retry_at=None, probing=False, last_error=None)
+                return
+            breaker["failures"] += 1
+            breaker["last_error"] = error
+            if probe:
+                cooldown = min(breaker["cooldown"] * 2, BREAKER_COOLDOWN_MAX)
+            elif breaker["state"] == "closed" and breaker["failures"] >= BREAKER_FAILURES:
+                cooldown = BREAKER_COOLDOWN
+                breaker["trips"] += 1
+                breaker["opened_at"] = time.time()
+            else:
+                return
+            breaker.update(state="open", cooldown=cooldown, retry_at=time.time() + cooldown, probing=False)
+        logger.warning(f"GitHub failing ({error}), circuit breaker open for {cooldown:.0f}s")
+        probe_timer = Timer(cooldown, probe_github)
+        probe_timer.daemon = True
+        probe_timer.start()
+
+    def probe_github():
+        """Scheduled half-open check, so the breaker can close even when nobody is clicking"""
+        conf = get_config()
+        if conf and breaker["state"] != "closed":
+            github_api("GET", conf['repo'], conf['token'])
+
+    def breaker_error():
+        """Message for callers to fail fast with while the breaker is not closed, else None"""
+        with breaker_lock:
+            if breaker["state"] == "closed":
+                return None
+            wait = max(0, int((breaker["retry_at"] or 0) - time.time()))
+            return f"GitHub is unavailable, retrying in {wait}s"
+
+    def breaker_status():
+        with breaker_lock:
+            return {k: breaker[k] for k in ("state", "failures", "opened_at", "retry_at", "trips",
+                                            "short_circuited", "last_error")}
+
     def github_api(method, path, token, data=None):
-        url = f"https://api.github.com/repos/{path}"
+        url = f"{GITHUB_API}/repos/{path}"
         headers = {"Authorization": f"token {token}", "Accept": "application/vnd.github.v3+json"}
+        allowed, probe = breaker_admit()
+        if not allowed:
+            logger.debug(f"Circuit breaker open, not calling GitHub for {method} {path}")
+            return None
+        session = github_session()
+        res = None
+        start = time.perf_counter()
+        with span(f"{method} {path.split('/contents/', 1)[-1]}") as node:
+            try:
+                if method == "GET":
+                    res = session.get(url, headers=headers, timeout=15)
+                elif method == "PUT":
+                    res = session.put(url, headers=headers, json=data, timeout=30)
+                elif method == "POST":
+                    res = session.post(url, headers=headers, json=data, timeout=30)
+                elif method == "PATCH":
+                    res = session.patch(url, headers=headers, json=data, timeout=30)
+                elif method == "DELETE":
+                    res = session.delete(url, headers=headers, json=data, timeout=30)
+                return res
+            except Exception as e:
+                logger.error(f"GitHub API error: {e}")
+                return None
+            finally:
+                failed = res is None or res.status_code >= 500
+                breaker_record(not failed, probe, f"status {res.status_code}" if res is not None else "no response")
+                observe_github(res, time.perf_counter() - start)
+                if node is not None:
+                    sent = getattr(res, 'request', None)
+                    node["attrs"].update(
+                        status=res.status_code if res is not None else None,
+                        bytes_sent=len(sent.body) if sent is not None and sent.body else 0,
+                        bytes_received=len(res.content or b'') if res is not None else 0
+                    )
+
+    # Single-flight reads: concurrent callers for the same file share one GET and one decode
+    inflight_reads = {}
+    inflight_lock = threading.Lock()
+    file_generation = {}
+
+    def file_changed(repo, path):
+        """Called after a successful write so later readers do not join a fetch that started before it"""
+        with inflight_lock:
+            file_generation[(repo, path)] = file_generation.get((repo, path), 0) + 1
+
+    def fetch_json_file(conf, path):
+        """(data, sha, status) for a JSON file in the repo; data is shared between callers, treat it as read-only"""
+        repo = conf['repo']
+        with inflight_lock:
+            key = (repo, path, conf['token'], file_generation.get((repo, path), 0))
+            call = inflight_reads.get(key)
+            leader = call is None
+            if leader:
+                call = inflight_reads[key] = {"done": threading.Event(), "result": (None, None, None)}
+        if not leader:
+            cache_event("singleflight", True)
+            call["done"].wait()
+            return call["result"]
+        cache_event("singleflight", False)
         try:
-            if method == "GET":
-                return requests.get(url, headers=headers, timeout=15)
-            if method == "PUT":
-                return requests.put(url, headers=headers, json=data, timeout=30)
-            if method == "DELETE":
-                return requests.delete(url, headers=headers, json=data, timeout=30)
+            res = github_api("GET", f"{repo}/contents/{path}", conf['token'])
+            if res is not None and res.status_code == 200:
+                body = res.json()
+                data = json.loads(base64.b64decode(body['content']).decode('utf-8'))
+                call["result"] = (data, body['sha'], 200)
+            elif res is not None:
+                call["result"] = (None, None, res.status_code)
         except Exception as e:
-            logger.error(f"GitHub API error: {e}")
-            return None
+            logger.error(f"Error reading {path}: {e}")
+        finally:
+            with inflight_lock:
+                inflight_reads.pop(key, None)
+            call["done"].set()
+        return call["result"]
 
     def delete_file_from_github(path, token, repo):
         """Delete a file from GitHub repository"""
+        with span("delete file", path=path):
+            return remove_github_file(path, token, repo)
+
+    def remove_github_file(path, token, repo):
         try:
             # First get the file's SHA
             res = github_api("GET", f"{repo}/contents/{path}", token)
@@ -2659,332 +3626,1815 @@ def start_my_app():
             logger.error(f"Error deleting file {path}: {e}")
             return False
 
-    @flask_app.route('/')
-    def home():
-        logger.info("Home route accessed")
-        try:
-            if os.path.exists(CONFIG_FILE): 
-                return render_template_string(ADMIN_TEMPLATE)
-            else: 
-                return render_template_string(SETUP_TEMPLATE)
-        except Exception as e:
-            logger.error(f"Error in home route: {e}")
-            return f"Error loading application: {e}"
+    # Last known catalog, settings and banners kept on disk; served at once, revalidated in the background
+    SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.abspath(CONFIG_FILE)), 'snapshots')
+    SNAPSHOT_FILES = ("all_products.json", "settings.json", "banners.json")
+    SNAPSHOT_REVALIDATE = float(os.environ.get('AXIS_SNAPSHOT_REVALIDATE', 2))
+    snapshots = {}
+    snapshot_lock = threading.Lock()
+    snapshot_writer = ThreadPoolExecutor(max_workers=1)
 
-    @flask_app.route('/api/setup', methods=['POST'])
-    def setup():
-        logger.info("Setup API called")
-        try:
-            data = request.json
-            if not data or 'repo' not in data or 'token' not in data:
-                return jsonify({"success": False, "error": "Missing repository or token"})
-            
-            res = github_api("GET", f"{data['repo']}", data['token'])
-            if res and res.status_code == 200:
-                with open(CONFIG_FILE, 'w') as f: 
-                    json.dump(data, f, indent=2)
-                logger.info("Configuration saved")
-                return jsonify({"success": True})
-            else:
-                return jsonify({"success": False, "error": "Invalid credentials"})
-        except Exception as e:
-            logger.error(f"Setup error: {e}")
-            return jsonify({"success": False, "error": str(e)})
+    def snapshot_path(repo):
+        return os.path.join(SNAPSHOT_DIR, re.sub(r'[^\w.-]', '_', repo) + '.json')
 
-    @flask_app.route('/api/get-data')
-    def get_data():
-        logger.info("Get data API called")
-        try:
-            if not os.path.exists(CONFIG_FILE): 
-                return jsonify({})
-            
-            with open(CONFIG_FILE, 'r') as f: 
-                conf = json.load(f)
-            
-            # Get products
-            prods = []
-            res_p = github_api("GET", f"{conf['repo']}/contents/all_products.json", conf['token'])
-            if res_p and res_p.status_code == 200:
-                try:
-                    prods = json.loads(base64.b64decode(res_p.json()['content']).decode('utf-8'))
-                    logger.info(f"Loaded {len(prods)} products")
-                except Exception as e:
-                    logger.error(f"Error parsing products: {e}")
-                    prods = []
-            
-            # Get categories and whatsapp number from settings.json
-            cats = []
-            whatsapp = ''
-            res_s = github_api("GET", f"{conf['repo']}/contents/settings.json", conf['token'])
-            if res_s and res_s.status_code == 200:
+    def get_snapshot(repo):
+        """In-memory snapshot of a repo, read from disk the first time it is needed"""
+        with snapshot_lock:
+            snap = snapshots.get(repo)
+            if snap is None:
+                snap = {"files": {}, "synced": None, "refreshing": False, "checked": 0.0, "error": None, "dirty": False}
                 try:
-                    settings = json.loads(base64.b64decode(res_s.json()['content']).decode('utf-8'))
-                    cats = settings.get('categories', [])
-                    whatsapp = settings.get('whatsappNumber', '')
+                    with open(snapshot_path(repo), encoding='utf-8') as f:
+                        saved = json.load(f)
+                    snap.update(files=saved.get("files", {}), synced=saved.get("synced"))
+                    cache_event("snapshot", True)
+                except FileNotFoundError:
+                    cache_event("snapshot", False)
                 except Exception as e:
-                    logger.error(f"Error parsing settings: {e}")
-            
-            # Get banners
-            banner_list = []
-            res_b = github_api("GET", f"{conf['repo']}/contents/banners.json", conf['token'])
-            if res_b and res_b.status_code == 200:
-                try:
-                    banner_list = json.loads(base64.b64decode(res_b.json()['content']).decode('utf-8'))
-                    logger.info(f"Loaded {len(banner_list)} banners")
-                except Exception as e:
-                    logger.error(f"Error parsing banners: {e}")
-                    banner_list = []
-            
-            return jsonify({"products": prods, "categories": cats, "banners": banner_list, "whatsapp": whatsapp})
-        except Exception as e:
-            logger.error(f"Get data error: {e}")
-            return jsonify({"products": [], "categories": [], "banners": [], "whatsapp": ""})
+                    logger.error(f"Error reading snapshot: {e}")
+                snapshots[repo] = snap
+            return snap
 
-    @flask_app.route('/api/update-settings', methods=['POST'])
-    def update_settings():
-        logger.info("Update settings API called")
+    def write_snapshot(repo):
+        with snapshot_lock:
+            snap = snapshots.get(repo)
+            if not snap or not snap["dirty"]:
+                return
+            snap["dirty"] = False
+            saved = {"repo": repo, "synced": snap["synced"], "files": dict(snap["files"])}
         try:
-            with open(CONFIG_FILE, 'r') as f: 
-                conf = json.load(f)
-            
-            data = request.json
-            whatsapp_number = data.get('whatsappNumber', '')
-            
-            # Get existing settings
-            res = github_api("GET", f"{conf['repo']}/contents/settings.json", conf['token'])
-            if res and res.status_code == 200:
-                settings = json.loads(base64.b64decode(res.json()['content']).decode('utf-8'))
-                sha = res.json()['sha']
-            else:
-                settings = {"categories": []}
-                sha = None
-            
-            # Update whatsapp number
-            settings['whatsappNumber'] = whatsapp_number
-            
-            # Prepare content
-            content = base64.b64encode(json.dumps(settings, indent=2).encode('utf-8')).decode('utf-8')
-            payload = {
-                "message": "Update WhatsApp number",
-                "content": content,
-                "sha": sha
-            }
-            
-            put_res = github_api("PUT", f"{conf['repo']}/contents/settings.json", conf['token'], payload)
-            if put_res and put_res.status_code in [200, 201]:
-                return jsonify({"success": True})
-            else:
-                return jsonify({"success": False, "error": "Failed to update settings"})
+            os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+            path = snapshot_path(repo)
+            with open(path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(saved, f, separators=(',', ':'), ensure_ascii=False)
+            os.replace(path + '.tmp', path)
         except Exception as e:
-            logger.error(f"Update settings error: {e}")
-            return jsonify({"success": False, "error": str(e)})
+            logger.error(f"Error writing snapshot: {e}")
 
-    @flask_app.route('/api/update-cats', methods=['POST'])
-    def update_cats():
-        logger.info("Update categories API called")
+    def schedule_snapshot_write(repo):
         try:
-            with open(CONFIG_FILE, 'r') as f: 
-                conf = json.load(f)
-            
-            res = github_api("GET", f"{conf['repo']}/contents/settings.json", conf['token'])
-            sha = res.json()['sha'] if res and res.status_code == 200 else None
-            
-            # Update only categories in settings
-            if sha:
-                # Get existing settings first
-                existing_settings = json.loads(base64.b64decode(res.json()['content']).decode('utf-8'))
-                existing_settings['categories'] = request.json['categories']
-                content = base64.b64encode(json.dumps(existing_settings, indent=2).encode('utf-8')).decode('utf-8')
-            else:
-                content = base64.b64encode(json.dumps({"categories": request.json['categories']}, indent=2).encode('utf-8')).decode('utf-8')
-            
-            result = github_api("PUT", f"{conf['repo']}/contents/settings.json", conf['token'], {
-                "message": "Update categories",
-                "content": content, 
-                "sha": sha
-            })
-            
-            if result and result.status_code in [200, 201]:
-                return jsonify({"success": True})
-            else:
-                return jsonify({"success": False})
-        except Exception as e:
-            logger.error(f"Update categories error: {e}")
-            return jsonify({"success": False})
+            snapshot_writer.submit(write_snapshot, repo)
+        except RuntimeError:
+            pass  # flush_snapshots() already stopped the writer
 
-    @flask_app.route('/api/upload', methods=['POST'])
-    def upload():
-        logger.info("Upload API called")
+    def flush_snapshots(timeout=30):
+        """Let running revalidations finish, write what they queued and stop the writer (call before teardown)"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with snapshot_lock:
+                if not any(snap["refreshing"] for snap in snapshots.values()):
+                    break
+            time.sleep(0.05)
+        snapshot_writer.shutdown(wait=True)
+
+    flask_app.extensions['axis_flush_snapshots'] = flush_snapshots
+
+    def snapshot_put(conf, path, data, sha):
+        """Record a file we just wrote so the next load shows it without asking GitHub"""
+        if path not in SNAPSHOT_FILES:
+            return
+        snap = get_snapshot(conf['repo'])
+        with snapshot_lock:
+            snap["files"][path] = {"data": data, "sha": sha}
+            snap["dirty"] = True
+        schedule_snapshot_write(conf['repo'])
+
+    def revalidate_snapshot(conf):
+        """Re-read the snapshot files from GitHub; unreachable files keep their saved copy"""
+        snap = get_snapshot(conf['repo'])
+        errors = []
+        for path in SNAPSHOT_FILES:
+            with inflight_lock:
+                generation = file_generation.get((conf['repo'], path), 0)
+            data, sha, status = fetch_json_file(conf, path)
+            if data is None and status != 404:
+                errors.append(f"{path}: {status or 'unreachable'}")
+                continue
+            # Check and store in one step: a write that finished while we were reading bumped the
+            # generation before its own snapshot_put, so what we read is older and must not win
+            with snapshot_lock:
+                with inflight_lock:
+                    if file_generation.get((conf['repo'], path), 0) != generation:
+                        continue
+                if path not in snap["files"] or snap["files"][path]["sha"] != sha:
+                    snap["files"][path] = {"data": data, "sha": sha}
+                    snap["dirty"] = True
+                if path == "all_products.json" and data is not None:
+                    remember_catalog(conf, data, sha)
+        with snapshot_lock:
+            snap["error"] = "; ".join(errors) or None
+            if not errors:
+                snap["synced"] = time.time()
+                snap["dirty"] = True
+        schedule_snapshot_write(conf['repo'])
+
+    def refresh_in_background(conf):
+        """Start one background revalidation unless one is running or ran very recently"""
+        snap = get_snapshot(conf['repo'])
+        with snapshot_lock:
+            if snap["refreshing"] or time.monotonic() - snap["checked"] < SNAPSHOT_REVALIDATE:
+                return
+            snap["refreshing"] = True
+            snap["checked"] = time.monotonic()
+
+        def run():
+            try:
+                revalidate_snapshot(conf)
+            except Exception as e:
+                logger.error(f"Snapshot refresh error: {e}")
+            finally:
+                with snapshot_lock:
+                    snap["refreshing"] = False
+
+        Thread(target=run, daemon=True).start()
+
+    def sync_status(snap):
+        with snapshot_lock:
+            shas = [(snap["files"].get(p) or {}).get("sha") or "" for p in SNAPSHOT_FILES]
+            status = {
+                "synced": snap["synced"],
+                "refreshing": snap["refreshing"],
+                "error": snap["error"],
+                "version": hashlib.sha1("|".join(shas).encode()).hexdigest()[:12]
+            }
+        status["queue"] = journal_status()
+        status["github"] = breaker_status()
+        status["uploads"] = upload_status()
+        return status
+
+    def drop_snapshots():
+        with snapshot_lock:
+            snapshots.clear()
+        if os.path.isdir(SNAPSHOT_DIR):
+            for name in os.listdir(SNAPSHOT_DIR):
+                os.remove(os.path.join(SNAPSHOT_DIR, name))
+
+    # Serialized read-modify-write of the repo's JSON files, retried on sha conflicts
+    MUTATION_ATTEMPTS = 5
+    MUTATION_BACKOFF = 0.25
+    file_locks = {}
+    file_locks_guard = threading.Lock()
+
+    class MutationRejected(Exception):
+        """The requested change no longer applies to the current file (e.g. product already deleted)"""
+
+    class GitHubUnavailable(RuntimeError):
+        """GitHub could not be reached or kept failing on its side; the change may be retried later"""
+
+    def github_unavailable(status):
+        """Whether a final status means GitHub itself is down or rate limiting us, rather than the request being wrong"""
+        return status is None or status >= 500 or status == 429 or (status == 403 and rate_limit["remaining"] == 0)
+
+    def file_lock(repo, path):
+        with file_locks_guard:
+            return file_locks.setdefault((repo, path), threading.Lock())
+
+    def mutate_json_file(conf, path, apply, message, default=list):
+        """GET path, apply(data) and PUT it back under a per-file lock; on a sha conflict re-fetch and re-apply.
+
+        Returns (old, new, sha). apply gets a shallow copy and may raise MutationRejected."""
+        repo = conf['repo']
+        with file_lock(repo, path), span("mutate", path=path) as node:
+            for attempt in range(1, MUTATION_ATTEMPTS + 1):
+                if node is not None:
+                    node["attrs"]["attempts"] = attempt
+                old, sha, status = fetch_json_file(conf, path)
+                if status == 404:
+                    old = default()
+                if old is not None:
+                    new = apply(copy.copy(old))
+                    content = base64.b64encode(json.dumps(new, indent=2).encode('utf-8')).decode('utf-8')
+                    put_res = github_api("PUT", f"{repo}/contents/{path}", conf['token'], {
+                        "message": message,
+                        "content": content,
+                        "sha": sha
+                    })
+                    if put_res is not None and put_res.status_code in [200, 201]:
+                        file_changed(repo, path)
+                        snapshot_put(conf, path, new, put_res.json()['content']['sha'])
+                        return old, new, put_res.json()['content']['sha']
+                    status = put_res.status_code if put_res is not None else None
+                if status is not None and status < 500 and status not in (404, 409, 422):
+                    break
+                if breaker_error():
+                    raise GitHubUnavailable(breaker_error())
+                if attempt < MUTATION_ATTEMPTS:
+                    delay = MUTATION_BACKOFF * 2 ** (attempt - 1) * (0.5 + random.random())
+                    logger.warning(f"Write to {path} failed ({status}), retrying in {delay:.2f}s")
+                    time.sleep(delay)
+            if github_unavailable(status):
+                raise GitHubUnavailable(f"Could not update {path} (GitHub status {status})")
+            raise RuntimeError(f"Could not update {path} (GitHub status {status})")
+
+    def locate_product(prods, product_id, index):
+        """Position of the product to change: by id when the client sent one, else its list index"""
+        if product_id is not None:
+            for i, p in enumerate(prods):
+                if p.get('id') == product_id:
+                    return i
+            raise MutationRejected("Product no longer exists, reload and try again")
+        if 0 <= index < len(prods):
+            return index
+        raise MutationRejected("Product not found")
+
+    # Adaptive image upload concurrency (AIMD): one more slot per round of successes, halved when GitHub throttles
+    UPLOAD_MIN = int(os.environ.get('AXIS_UPLOAD_MIN', 1))
+    UPLOAD_MAX = int(os.environ.get('AXIS_UPLOAD_MAX', 8))
+    UPLOAD_ATTEMPTS = 4
+    UPLOAD_PENALTY = float(os.environ.get('AXIS_UPLOAD_PENALTY', 60))
+    UPLOAD_MAX_WAIT = float(os.environ.get('AXIS_UPLOAD_MAX_WAIT', 5))
+    UPLOAD_WINDOW = 10
+    upload_state = {"limit": float(max(UPLOAD_MIN, min(2, UPLOAD_MAX))), "active": 0, "paused_until": 0.0,
+                    "uploaded": 0, "throttled": 0, "bytes": 0}
+    upload_recent = deque()
+    upload_cond = threading.Condition()
+    upload_pool = ThreadPoolExecutor(max_workers=UPLOAD_MAX, thread_name_prefix="axis-upload")
+
+    def throttle_delay(res):
+        """Seconds GitHub wants us to back off for, or None when the response is not throttling"""
+        if res is None:
+            return None
+        if 'Retry-After' in res.headers:
+            try:
+                return float(res.headers['Retry-After'])
+            except ValueError:
+                return UPLOAD_PENALTY
+        if res.status_code not in (403, 429):
+            return None
+        if res.headers.get('X-RateLimit-Remaining') == '0':
+            return max(int(res.headers.get('X-RateLimit-Reset', 0)) - time.time(), 1)
+        if res.status_code == 429 or 'rate limit' in res.text.lower():
+            return UPLOAD_PENALTY  # secondary rate limit without a hint: GitHub asks for at least a minute
+        return None  # a plain 403 is a permissions problem
+
+    def acquire_upload_slot():
+        """Wait for a free slot; a pause longer than UPLOAD_MAX_WAIT is left to the journal replayer"""
+        with upload_cond:
+            while True:
+                wait = upload_state["paused_until"] - time.time()
+                if wait > UPLOAD_MAX_WAIT:
+                    raise GitHubUnavailable(f"GitHub rate limit reached, uploads paused for {wait:.0f}s")
+                if wait <= 0 and upload_state["active"] < int(upload_state["limit"]):
+                    upload_state["active"] += 1
+                    return
+                upload_cond.wait(wait if wait > 0 else None)
+
+    def release_upload_slot(size, ok, delay):
+        """Additive increase after a success, multiplicative decrease (once per pause) when throttled"""
+        with upload_cond:
+            upload_state["active"] -= 1
+            now = time.time()
+            if delay is not None:
+                upload_state["throttled"] += 1
+                if now >= upload_state["paused_until"]:
+                    upload_state["limit"] = max(UPLOAD_MIN, upload_state["limit"] / 2)
+                upload_state["paused_until"] = max(upload_state["paused_until"], now + delay)
+            elif ok:
+                upload_state["limit"] = min(UPLOAD_MAX, upload_state["limit"] + 1 / upload_state["limit"])
+                upload_state["uploaded"] += 1
+                upload_state["bytes"] += size
+                upload_recent.append((now, size))
+            upload_cond.notify_all()
+
+    def push_blob(conf, img_b64):
+        """POST one image as a git blob within the adaptive limit, retrying short throttling pauses; returns its sha.
+
+        Blobs only become visible once commit_files() points a tree at them, so pushing them in parallel is safe
+        and pushing the same bytes twice is harmless."""
+        for attempt in range(UPLOAD_ATTEMPTS):
+            acquire_upload_slot()
+            res, delay = None, None
+            try:
+                res = github_api("POST", f"{conf['repo']}/git/blobs", conf['token'], {
+                    "content": img_b64,
+                    "encoding": "base64"
+                })
+                delay = throttle_delay(res)
+            finally:
+                release_upload_slot(len(img_b64) * 3 // 4, res is not None and res.status_code == 201, delay)
+            if delay is None:
+                break
+            logger.warning(f"GitHub throttled an image upload ({res.status_code}), pausing {delay:.0f}s "
+                           f"at concurrency {upload_state['limit']:.1f}")
+            if delay > UPLOAD_MAX_WAIT:
+                raise GitHubUnavailable(f"GitHub rate limit reached, uploads paused for {delay:.0f}s")
+        status = res.status_code if res is not None else None
+        if status == 201:
+            return res.json()['sha']
+        if delay is not None or github_unavailable(status):
+            raise GitHubUnavailable(f"Could not upload image (GitHub status {status})")
+        raise RuntimeError(f"Could not upload image (GitHub status {status})")
+
+    def commit_files(conf, files, message):
+        """Point many paths at blob shas (None removes the path) in one commit on main.
+
+        Ref updates are serialized per repo; if the branch moved meanwhile the tree is rebuilt on the new head."""
+        repo, token = conf['repo'], conf['token']
+        tree = [{"path": path, "mode": "100644", "type": "blob", "sha": sha} for path, sha in files.items()]
+        with file_lock(repo, "refs/heads/main"), span("commit files", count=len(files)) as node:
+            for attempt in range(1, MUTATION_ATTEMPTS + 1):
+                if node is not None:
+                    node["attrs"]["attempts"] = attempt
+                res = github_api("GET", f"{repo}/git/ref/heads/main", token)
+                if res is not None and res.status_code == 200:
+                    head = res.json()['object']['sha']
+                    res = github_api("GET", f"{repo}/git/commits/{head}", token)
+                if res is not None and res.status_code == 200:
+                    res = github_api("POST", f"{repo}/git/trees", token, {"base_tree": res.json()['tree']['sha'],
+                                                                         "tree": tree})
+                if res is not None and res.status_code == 201:
+                    res = github_api("POST", f"{repo}/git/commits", token, {"message": message,
+                                                                           "tree": res.json()['sha'],
+                                                                           "parents": [head]})
+                if res is not None and res.status_code == 201:
+                    commit = res.json()['sha']
+                    # Not forced: a 422 here means another write moved main after we read it
+                    res = github_api("PATCH", f"{repo}/git/refs/heads/main", token, {"sha": commit})
+                    if res is not None and res.status_code == 200:
+                        return commit
+                status = res.status_code if res is not None else None
+                if status is not None and status < 500 and status not in (404, 409, 422):
+                    break
+                if breaker_error():
+                    raise GitHubUnavailable(breaker_error())
+                if attempt < MUTATION_ATTEMPTS:
+                    delay = MUTATION_BACKOFF * 2 ** (attempt - 1) * (0.5 + random.random())
+                    logger.warning(f"Commit of {len(files)} files failed ({status}), retrying in {delay:.2f}s")
+                    time.sleep(delay)
+            if github_unavailable(status):
+                raise GitHubUnavailable(f"Could not commit {len(files)} files (GitHub status {status})")
+            raise RuntimeError(f"Could not commit {len(files)} files (GitHub status {status})")
+
+    def upload_status():
+        with upload_cond:
+            now = time.time()
+            while upload_recent and upload_recent[0][0] < now - UPLOAD_WINDOW:
+                upload_recent.popleft()
+            return {
+                "concurrency": round(upload_state["limit"], 2),
+                "active": upload_state["active"],
+                "paused_for": round(max(0, upload_state["paused_until"] - now), 1),
+                "uploaded": upload_state["uploaded"],
+                "throttled": upload_state["throttled"],
+                "bytes": upload_state["bytes"],
+                "images_per_s": round(len(upload_recent) / UPLOAD_WINDOW, 2),
+                "bytes_per_s": round(sum(size for _, size in upload_recent) / UPLOAD_WINDOW)
+            }
+
+    # Offline journal: product uploads hit the disk first and are pushed to GitHub in order
+    JOURNAL_DIR = os.path.join(os.path.dirname(os.path.abspath(CONFIG_FILE)), 'journal')
+    JOURNAL_FILE = os.path.join(JOURNAL_DIR, 'journal.jsonl')
+    JOURNAL_SPOOL = os.path.join(JOURNAL_DIR, 'spool')
+    JOURNAL_RETRY_MAX = float(os.environ.get('AXIS_JOURNAL_RETRY_MAX', 60))
+    journal = {"loaded": False, "pending": [], "inflight": set(), "offline": False, "replaying": False,
+               "applied": 0, "failed": 0, "last_error": None, "next_retry": None}
+    journal_lock = threading.Lock()
+
+    def journal_append(record):
+        """Append one line and fsync it; call with journal_lock held"""
+        os.makedirs(JOURNAL_DIR, exist_ok=True)
+        with open(JOURNAL_FILE, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, separators=(',', ':')) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def load_journal():
+        """Read entries without a done line back into pending, in journal order; call with journal_lock held"""
+        if journal["loaded"]:
+            return
+        journal["loaded"] = True
+        entries = {}
         try:
-            with open(CONFIG_FILE, 'r') as f: 
-                conf = json.load(f)
-            
-            data = request.json
-            edit_idx = int(data.get('editIndex', -1))
-            
-            # Get existing products
-            res = github_api("GET", f"{conf['repo']}/contents/all_products.json", conf['token'])
-            if res and res.status_code == 200:
-                prods = json.loads(base64.b64decode(res.json()['content']).decode('utf-8'))
-                sha = res.json()['sha']
+            with open(JOURNAL_FILE, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line from a crash mid-write
+                    if 'done' in record:
+                        entries.pop(record['done'], None)
+                    else:
+                        entries[record['key']] = record
+        except FileNotFoundError:
+            pass
+        journal["pending"] = list(entries.values())
+        journal["offline"] = bool(entries)
+        if entries:
+            logger.info(f"Journal has {len(entries)} queued changes from a previous run")
+
+    def spool_path(entry, i):
+        return os.path.join(JOURNAL_SPOOL, entry['key'], f"{i}.img")
+
+    last_product_id = {"value": 0}
+    product_id_lock = threading.Lock()
+
+    def new_product_id():
+        """Millisecond timestamp id, bumped past the last one handed out so two products never share it"""
+        with product_id_lock:
+            last_product_id["value"] = max(last_product_id["value"] + 1, int(time.time() * 1000))
+            return last_product_id["value"]
+
+    def journal_product_change(conf, kind, data):
+        """Spool the request's images and journal it before anything goes to GitHub"""
+        prod = dict(data['product'])
+        images = prod.pop('newImages', None) or []
+        entry = {
+            "key": f"{int(time.time() * 1000)}-{os.urandom(4).hex()}",
+            "kind": kind,
+            "repo": conf['repo'],
+            "ts": new_product_id(),
+            "queued_at": time.time(),
+            "editIndex": int(data.get('editIndex', -1)),
+            "editId": data.get('editId'),
+            "product": prod,
+            "images": len(images)
+        }
+        os.makedirs(os.path.join(JOURNAL_SPOOL, entry['key']), exist_ok=True)
+        for i, img_b64 in enumerate(images):
+            with open(spool_path(entry, i), 'wb') as f:
+                f.write(base64.b64decode(img_b64))
+                f.flush()
+                os.fsync(f.fileno())
+        with journal_lock:
+            load_journal()
+            journal_append(entry)
+            journal["pending"].append(entry)
+        return entry
+
+    def finish_journal_entry(entry, error=None):
+        """Mark an entry done (applied, or dropped with error) and drop its spooled images"""
+        with journal_lock:
+            journal_append({"done": entry['key'], "error": error})
+            journal["pending"] = [e for e in journal["pending"] if e['key'] != entry['key']]
+            journal["inflight"].discard(entry['key'])
+            if error:
+                journal["failed"] += 1
             else:
-                prods = []
-                sha = None
+                journal["applied"] += 1
+            if not journal["pending"]:
+                open(JOURNAL_FILE, 'w').close()
+        for i in range(entry['images']):
+            try:
+                os.remove(spool_path(entry, i))
+            except FileNotFoundError:
+                pass
+        try:
+            os.rmdir(os.path.join(JOURNAL_SPOOL, entry['key']))
+        except OSError:
+            pass
 
-            prod = data['product']
-            ts = int(time.time()*1000)
-            
-            # Handle removed images - delete them from GitHub
-            removed_images = prod.get('removedImages', [])
+    def apply_product_change(conf, entry):
+        """Push one journalled upload to GitHub; repeating it after a crash part-way through is harmless"""
+        prod = entry['product']
+        ts = entry['ts']
+        edit_idx, edit_id = entry['editIndex'], entry['editId']
+
+        # Push the spooled images as blobs in parallel, as many at once as GitHub currently tolerates,
+        # then publish them all in one commit
+        suffix = "img" if entry['kind'] == "upload" else "bulk"
+
+        def upload_one(i):
+            # Generate consistent filename using title, description, timestamp
+            filename = generate_filename(prod.get('title', 'product'), prod.get('description', ''), ts, f"{suffix}_{i}")
+            with open(spool_path(entry, i), 'rb') as f:
+                img_b64 = base64.b64encode(f.read()).decode('utf-8')
+            return f"images/{filename}", push_blob(conf, img_b64)
+
+        with span("upload images", count=entry['images']):
+            futures = [upload_pool.submit(bind_operation(upload_one), i) for i in range(entry['images'])]
+            blobs = dict(f.result() for f in futures)
+            if blobs:
+                commit_files(conf, blobs, "Upload product images")
+        new_image_urls = [f"https://raw.githubusercontent.com/{conf['repo']}/main/{fname}" for fname in blobs]
+
+        # Combine existing (non-removed) images with new images
+        all_image_urls = prod.get('existingImages', []) + new_image_urls
+        item = {
+            "id": ts,
+            "title": prod.get('title', ''),
+            "price": prod.get('price', 0),
+            "category": prod.get('category', 'General'),
+            "offer": prod.get('offer', 0),
+            "description": prod.get('description', prod.get('desc', '')),
+            "images": all_image_urls,
+            "image": all_image_urls[0] if all_image_urls else "",
+            "updated": ts
+        }
+        is_new = entry['kind'] == "upload_bulk" or (edit_idx == -1 and edit_id is None)
+
+        def apply(prods):
+            if is_new:
+                for i, p in enumerate(prods):
+                    if p.get('id') == ts:
+                        prods[i] = item
+                        return prods
+                prods.insert(0, item)
+            else:
+                i = locate_product(prods, edit_id, edit_idx)
+                prods[i] = dict(item, id=prods[i].get('id', ts))
+            return prods
+
+        message = "Bulk upload products" if entry['kind'] == "upload_bulk" else "Update products"
+        old_prods, prods, sha = mutate_json_file(conf, "all_products.json", apply, message)
+        logger.info("Added new product" if is_new else "Updated product")
+        remember_catalog(conf, prods, sha)
+        publish_search_index(conf, old_prods, prods)
+
+        # Handle removed images - delete them from GitHub, now that the catalog no longer references them
+        removed_images = prod.get('removedImages', [])
+        with span("delete removed images", count=len(removed_images)):
             for img_url in removed_images:
                 path = extract_image_path_from_url(img_url, conf['repo'])
                 if path:
                     delete_file_from_github(path, conf['token'], conf['repo'])
                     logger.info(f"Deleted image: {path}")
-            
-            # Handle existing images (not removed)
-            existing_images = prod.get('existingImages', [])
-            
-            # Handle new images
-            new_images_base64 = prod.get('newImages', [])
-            new_image_urls = []
-            
-            for i, img_b64 in enumerate(new_images_base64):
-                time.sleep(0.3)
-                # Generate consistent filename using title, description, timestamp
-                filename = generate_filename(
-                    prod.get('title', 'product'),
-                    prod.get('description', ''),
-                    ts,
-                    f"img_{i}"
-                )
-                fname = f"images/{filename}"
-                upload_res = github_api("PUT", f"{conf['repo']}/contents/{fname}", conf['token'], {
-                    "message": "Upload product image",
-                    "content": img_b64
-                })
-                if upload_res and upload_res.status_code in [200, 201]:
-                    new_image_urls.append(f"https://raw.githubusercontent.com/{conf['repo']}/main/{fname}")
-            
-            # Combine existing (non-removed) images with new images
-            all_image_urls = existing_images + new_image_urls
-            
-            # Create product object (buyLink removed)
-            item = {
-                "id": ts if edit_idx == -1 else prods[edit_idx].get('id', ts),
+
+    def submit_product_change(conf, kind, data):
+        """Journal an upload, then push it now; if GitHub is unreachable it waits for the replayer"""
+        entry = journal_product_change(conf, kind, data)
+        with journal_lock:
+            queued = journal["offline"]
+            if not queued:
+                journal["inflight"].add(entry['key'])
+        if not queued:
+            try:
+                apply_product_change(conf, entry)
+            except GitHubUnavailable as e:
+                logger.warning(f"GitHub unreachable, {kind} queued for replay: {e}")
+                with journal_lock:
+                    journal["inflight"].discard(entry['key'])
+                    if not journal["offline"]:
+                        journal.update(offline=True, applied=0, failed=0)
+                    journal["last_error"] = str(e)
+            except Exception as e:
+                finish_journal_entry(entry, str(e))
+                raise
+            else:
+                finish_journal_entry(entry)
+                return {"success": True}
+        start_replayer()
+        with journal_lock:
+            return {"success": True, "queued": True, "pending": len(journal["pending"])}
+
+    def start_replayer():
+        with journal_lock:
+            if journal["replaying"]:
+                return
+            journal["replaying"] = True
+        Thread(target=replay_journal, daemon=True).start()
+
+    def replay_journal():
+        """Push queued uploads one at a time in journal order, backing off while GitHub stays unreachable"""
+        delay = 2
+        while True:
+            with journal_lock:
+                load_journal()
+                if not journal["pending"]:
+                    journal.update(offline=False, replaying=False, last_error=None, next_retry=None)
+                    return
+                entry = journal["pending"][0]
+                conf = get_config()
+                if not conf or conf['repo'] != entry['repo']:
+                    journal.update(replaying=False, last_error=f"Waiting for {entry['repo']} to be set up again")
+                    return
+                busy = entry['key'] in journal["inflight"]
+                if not busy:
+                    journal["inflight"].add(entry['key'])
+            if busy:
+                time.sleep(0.5)  # still being sent by the request that queued it
+                continue
+            try:
+                apply_product_change(conf, entry)
+            except GitHubUnavailable as e:
+                # an exhausted rate limit says exactly when to come back
+                wait = max(delay, upload_state["paused_until"] - time.time())
+                with journal_lock:
+                    journal["inflight"].discard(entry['key'])
+                    journal.update(last_error=str(e), next_retry=time.time() + wait)
+                logger.warning(f"Replay paused, retrying in {wait:.0f}s: {e}")
+                time.sleep(wait)
+                delay = min(delay * 2, JOURNAL_RETRY_MAX)
+            except Exception as e:
+                logger.error(f"Dropping queued {entry['kind']} that cannot be applied: {e}")
+                finish_journal_entry(entry, str(e))
+                with journal_lock:
+                    journal["last_error"] = str(e)
+            else:
+                finish_journal_entry(entry)
+                delay = 2
+                with journal_lock:
+                    journal["next_retry"] = None
+
+    def journal_status():
+        with journal_lock:
+            load_journal()
+            return {
+                "pending": len(journal["pending"]),
+                "offline": journal["offline"],
+                "replaying": journal["replaying"],
+                "applied": journal["applied"],
+                "failed": journal["failed"],
+                "last_error": journal["last_error"],
+                "next_retry": journal["next_retry"],
+                "items": [{"kind": e['kind'], "title": e['product'].get('title', ''), "queued_at": e['queued_at']}
+                          for e in journal["pending"][:20]]
+            }
+
+    # Storefront search index (catalog/search-index.json)
+    SEARCH_INDEX_PATH = "catalog/search-index.json"
+    SEARCH_INDEX_VERSION = 1
+    PRICE_BUCKETS = [(0, 500), (500, 1000), (1000, 5000), (5000, None)]
+    search_index_cache = {}
+
+    def tokenize(text):
+        """Split text into lowercase search tokens"""
+        if not text:
+            return []
+        return re.findall(r'\w+', str(text).lower())
+
+    def to_number(value, default=0):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return default
+
+    def price_bucket(price):
+        """Label of the price facet bucket a price falls into"""
+        price = to_number(price)
+        for low, high in PRICE_BUCKETS:
+            if high is None or price < high:
+                return f"{low}+" if high is None else f"{low}-{high}"
+        return f"{PRICE_BUCKETS[-1][0]}+"
+
+    def product_terms(prod):
+        return set(tokenize(prod.get('title')) + tokenize(prod.get('category')) + tokenize(prod.get('description')))
+
+    def product_doc(prod):
+        """Compact per-product record the storefront renders results from"""
+        return {
+            "t": prod.get('title', ''),
+            "c": prod.get('category', 'General'),
+            "p": prod.get('price', 0),
+            "o": prod.get('offer', 0),
+            "i": prod.get('image', '')
+        }
+
+    def new_search_index():
+        return {"docs": {}, "terms": {}, "category": {}, "price": {}}
+
+    def product_key(prod, position):
+        """Index key of a product: its id, or '#<position>' for entries saved without one"""
+        pid = prod.get('id')
+        return str(pid) if pid is not None else f"#{position}"
+
+    def keyed_products(prods):
+        return {product_key(p, i): p for i, p in enumerate(prods)}
+
+    def index_add(index, pid, prod):
+        index["docs"][pid] = product_doc(prod)
+        for term in product_terms(prod):
+            index["terms"].setdefault(term, set()).add(pid)
+        index["category"].setdefault(prod.get('category', 'General'), set()).add(pid)
+        index["price"].setdefault(price_bucket(prod.get('price', 0)), set()).add(pid)
+
+    def index_remove(index, pid, prod):
+        index["docs"].pop(pid, None)
+        for field, keys in (("terms", product_terms(prod)),
+                            ("category", [prod.get('category', 'General')]),
+                            ("price", [price_bucket(prod.get('price', 0))])):
+            for key in keys:
+                ids = index[field].get(key)
+                if ids is not None:
+                    ids.discard(pid)
+                    if not ids:
+                        del index[field][key]
+
+    def build_search_index(prods):
+        index = new_search_index()
+        for pid, prod in keyed_products(prods).items():
+            index_add(index, pid, prod)
+        return index
+
+    def update_search_index(index, old_prods, new_prods):
+        """Re-index only the products that were added, removed or changed"""
+        old_by_id = keyed_products(old_prods)
+        new_by_id = keyed_products(new_prods)
+        changed = 0
+        for pid, prod in old_by_id.items():
+            if new_by_id.get(pid) != prod:
+                index_remove(index, pid, prod)
+                changed += 1
+        for pid, prod in new_by_id.items():
+            if old_by_id.get(pid) != prod:
+                index_add(index, pid, prod)
+                changed += 1
+        return changed
+
+    def serialize_search_index(index):
+        """Sorted term list with parallel postings, so prefix lookups are a binary search"""
+        terms = sorted(index["terms"])
+        return {
+            "version": SEARCH_INDEX_VERSION,
+            "updated": int(time.time()*1000),
+            "count": len(index["docs"]),
+            "docs": index["docs"],
+            "terms": terms,
+            "postings": [sorted(index["terms"][t]) for t in terms],
+            "facets": {
+                "category": {k: sorted(v) for k, v in sorted(index["category"].items())},
+                "price": {k: sorted(v) for k, v in index["price"].items()}
+            }
+        }
+
+    def deserialize_search_index(data):
+        index = new_search_index()
+        index["docs"] = data.get('docs', {})
+        index["terms"] = {t: set(ids) for t, ids in zip(data.get('terms', []), data.get('postings', []))}
+        facets = data.get('facets', {})
+        index["category"] = {k: set(v) for k, v in facets.get('category', {}).items()}
+        index["price"] = {k: set(v) for k, v in facets.get('price', {}).items()}
+        return index
+
+    def publish_search_index(conf, old_prods, new_prods):
+        """Update catalog/search-index.json after a catalog write"""
+        with track_job("search_index"), span("search index", products=len(new_prods)):
+            with file_lock(conf['repo'], SEARCH_INDEX_PATH):
+                return write_search_index(conf, old_prods, new_prods)
+
+    def write_search_index(conf, old_prods, new_prods):
+        try:
+            repo = conf['repo']
+            cached = search_index_cache.get(repo)
+            index, sha = (cached["index"], cached["sha"]) if cached else (None, None)
+            cache_event("search_index", cached is not None)
+            if index is None:
+                res = github_api("GET", f"{repo}/contents/{SEARCH_INDEX_PATH}", conf['token'])
+                if res and res.status_code == 200:
+                    sha = res.json()['sha']
+                    data = json.loads(base64.b64decode(res.json()['content']).decode('utf-8'))
+                    if data.get('version') == SEARCH_INDEX_VERSION:
+                        index = deserialize_search_index(data)
+
+            if index is not None and set(index["docs"]) == set(keyed_products(old_prods)):
+                changed = update_search_index(index, old_prods, new_prods)
+                logger.info(f"Search index: re-indexed {changed} product entries")
+            else:
+                index = build_search_index(new_prods)
+                logger.info(f"Search index: full rebuild of {len(new_prods)} products")
+
+            body = json.dumps(serialize_search_index(index), separators=(',', ':'), ensure_ascii=False)
+            payload = {
+                "message": "Update search index",
+                "content": base64.b64encode(body.encode('utf-8')).decode('utf-8')
+            }
+            if sha:
+                payload["sha"] = sha
+            put_res = github_api("PUT", f"{repo}/contents/{SEARCH_INDEX_PATH}", conf['token'], payload)
+            if put_res and put_res.status_code in [200, 201]:
+                search_index_cache[repo] = {"index": index, "sha": put_res.json()['content']['sha']}
+                return True
+            search_index_cache.pop(repo, None)
+            return False
+        except Exception as e:
+            logger.error(f"Search index error: {e}")
+            search_index_cache.pop(conf.get('repo'), None)
+            return False
+
+    # In-memory catalog and query index for /api/products; the index is updated in place, so
+    # updates and queries both hold catalog_lock
+    catalog_cache = {}
+    catalog_lock = threading.RLock()
+
+    def sort_keys(pid, prod):
+        return (to_number(prod.get('price', 0)), pid), (to_number(prod.get('id', 0)), pid)
+
+    def build_query_index(prods):
+        qi = build_search_index(prods)
+        qi["by_id"] = keyed_products(prods)
+        qi["order"] = list(qi["by_id"])
+        qi["position"] = {pid: i for i, pid in enumerate(qi["order"])}
+        qi["by_price"] = sorted(sort_keys(pid, p)[0] for pid, p in qi["by_id"].items())
+        qi["by_date"] = sorted(sort_keys(pid, p)[1] for pid, p in qi["by_id"].items())
+        qi["term_list"] = None
+        return qi
+
+    def update_query_index(qi, old_prods, new_prods):
+        """Apply a catalog change to the query index without rebuilding it"""
+        old_by_id = keyed_products(old_prods)
+        new_by_id = keyed_products(new_prods)
+        update_search_index(qi, old_prods, new_prods)
+        for pid, prod in old_by_id.items():
+            if new_by_id.get(pid) != prod:
+                for key, arr in zip(sort_keys(pid, prod), (qi["by_price"], qi["by_date"])):
+                    i = bisect.bisect_left(arr, key)
+                    if i < len(arr) and arr[i] == key:
+                        arr.pop(i)
+        for pid, prod in new_by_id.items():
+            if old_by_id.get(pid) != prod:
+                for key, arr in zip(sort_keys(pid, prod), (qi["by_price"], qi["by_date"])):
+                    bisect.insort(arr, key)
+        qi["order"] = list(new_by_id)
+        qi["by_id"] = new_by_id
+        qi["position"] = {pid: i for i, pid in enumerate(qi["order"])}
+        qi["term_list"] = None
+
+    def remember_catalog(conf, prods, sha):
+        """Keep the latest known catalog for a repo and its query index in step"""
+        repo = conf['repo']
+        with catalog_lock:
+            cached = catalog_cache.get(repo)
+            if cached and cached["sha"] == sha:
+                return cached
+            if cached:
+                update_query_index(cached["index"], cached["products"], prods)
+                cached.update({"products": prods, "sha": sha})
+            else:
+                cached = {"products": prods, "sha": sha, "index": build_query_index(prods)}
+                catalog_cache[repo] = cached
+            return cached
+
+    def load_catalog(conf, refresh=False):
+        cached = catalog_cache.get(conf['repo'])
+        if cached and not refresh:
+            cache_event("catalog", True)
+            return cached
+        cache_event("catalog", False)
+        prods, sha, status = fetch_json_file(conf, "all_products.json")
+        if prods is not None:
+            return remember_catalog(conf, prods, sha)
+        return cached or remember_catalog(conf, [], None)
+
+    def query_products(qi, q='', category='', sort=''):
+        """Ids matching every query token (as a prefix) and the category, in the requested order"""
+        matches = None
+        tokens = tokenize(q)
+        if tokens:
+            if qi["term_list"] is None:
+                qi["term_list"] = sorted(qi["terms"])
+            terms = qi["term_list"]
+            for token in tokens:
+                ids = set()
+                i = bisect.bisect_left(terms, token)
+                while i < len(terms) and terms[i].startswith(token):
+                    ids |= qi["terms"][terms[i]]
+                    i += 1
+                matches = ids if matches is None else matches & ids
+        if category:
+            bucket = qi["category"].get(category, set())
+            matches = bucket if matches is None else matches & bucket
+
+        if sort in ("price_asc", "price_desc"):
+            ordered = (pid for _, pid in qi["by_price"])
+        elif sort in ("newest", "oldest"):
+            ordered = (pid for _, pid in qi["by_date"])
+        else:
+            ordered = iter(qi["order"])
+        if sort in ("price_desc", "newest"):
+            ordered = reversed(list(ordered))
+        if matches is None:
+            return list(ordered)
+        return [pid for pid in ordered if pid in matches]
+
+    # Streaming catalog export (CSV / NDJSON)
+    EXPORT_COLUMNS = ["id", "title", "price", "category", "offer", "description", "images", "updated"]
+
+    def product_version(prod):
+        """Millisecond timestamp of a product's last write (creation time for older entries)"""
+        return int(to_number(prod.get('updated', prod.get('id', 0))))
+
+    def export_rows(prods, fmt, category='', since=0):
+        """Yield the export one encoded row at a time"""
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        if fmt == 'csv':
+            writer.writerow(EXPORT_COLUMNS)
+        for prod in prods:
+            if category and prod.get('category', 'General') != category:
+                continue
+            if since and product_version(prod) <= since:
+                continue
+            images = prod.get('images') or ([prod['image']] if prod.get('image') else [])
+            row = {
+                "id": prod.get('id', ''),
                 "title": prod.get('title', ''),
                 "price": prod.get('price', 0),
                 "category": prod.get('category', 'General'),
                 "offer": prod.get('offer', 0),
-                "description": prod.get('description', prod.get('desc', '')),
-                "images": all_image_urls,
-                "image": all_image_urls[0] if all_image_urls else ""
+                "description": prod.get('description', ''),
+                "images": images,
+                "updated": product_version(prod)
             }
-            
-            if edit_idx > -1 and edit_idx < len(prods): 
-                prods[edit_idx] = item
-                logger.info(f"Updated product at index {edit_idx}")
-            else: 
-                prods.insert(0, item)
-                logger.info("Added new product")
-            
-            # Update products file
-            content = base64.b64encode(json.dumps(prods, indent=2).encode('utf-8')).decode('utf-8')
-            update_res = github_api("PUT", f"{conf['repo']}/contents/all_products.json", conf['token'], {
-                "message": "Update products",
-                "content": content, 
-                "sha": sha
-            })
-            
-            if update_res and update_res.status_code in [200, 201]:
-                return jsonify({"success": True})
+            if fmt == 'csv':
+                writer.writerow([row[col] if col != 'images' else '|'.join(images) for col in EXPORT_COLUMNS])
+            else:
+                buf.write(json.dumps(row, ensure_ascii=False) + '\n')
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+        if buf.tell():
+            yield buf.getvalue()
+
+    # Bulk price / offer rules evaluated column-wise over the catalog
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+
+    PRICE_CONDITIONS = {
+        "price_gt": operator.gt,
+        "price_gte": operator.ge,
+        "price_lt": operator.lt,
+        "price_lte": operator.le
+    }
+
+    def pricing_columns(prods):
+        cols = {
+            "id": [str(p.get('id')) for p in prods],
+            "category": [p.get('category', 'General') for p in prods],
+            "price": [to_number(p.get('price', 0)) for p in prods],
+            "offer": [to_number(p.get('offer', 0)) for p in prods]
+        }
+        if np is not None:
+            cols = {k: np.array(v, dtype=float if k in ('price', 'offer') else object) for k, v in cols.items()}
+        return cols
+
+    def rule_mask(cols, rule):
+        """Boolean column selecting the products a rule applies to"""
+        where = rule.get('where', {})
+        unknown = set(where) - set(PRICE_CONDITIONS)
+        if unknown:
+            raise ValueError(f"Unknown condition: {', '.join(sorted(unknown))}")
+        ids = {str(i) for i in rule['ids']} if 'ids' in rule else None
+        if np is not None:
+            mask = np.ones(len(cols["price"]), dtype=bool)
+            if 'category' in rule:
+                mask &= cols["category"] == rule['category']
+            for key, value in where.items():
+                mask &= PRICE_CONDITIONS[key](cols["price"], float(value))
+            if ids is not None:
+                mask &= np.isin(cols["id"], list(ids))
+            return mask
+        return [
+            ('category' not in rule or cat == rule['category'])
+            and all(PRICE_CONDITIONS[key](price, float(value)) for key, value in where.items())
+            and (ids is None or pid in ids)
+            for pid, cat, price in zip(cols["id"], cols["category"], cols["price"])
+        ]
+
+    def price_formula(rule):
+        """Price transform of a rule; works on a float or a NumPy column alike"""
+        floor = np.floor if np is not None else math.floor
+        maximum = np.maximum if np is not None else max
+
+        def apply(price):
+            if 'set_price' in rule:
+                price = price * 0 + float(rule['set_price'])
+            if 'adjust_pct' in rule:
+                price = price * (1 + float(rule['adjust_pct']) / 100)
+            if 'adjust_by' in rule:
+                price = price + float(rule['adjust_by'])
+            if 'round_to' in rule:
+                price = floor(price) + float(rule['round_to']) % 1
+            return maximum(price, 0)
+        return apply
+
+    def where_column(mask, new, old):
+        if np is not None:
+            return np.where(mask, new, old)
+        return [n if m else o for m, n, o in zip(mask, new, old)]
+
+    def evaluate_pricing(prods, rules, price_rows=None):
+        """New (price, offer) columns after applying the rules in order, then explicit id -> price rows"""
+        cols = pricing_columns(prods)
+        for rule in rules:
+            mask = rule_mask(cols, rule)
+            if any(k in rule for k in ('set_price', 'adjust_pct', 'adjust_by', 'round_to')):
+                formula = price_formula(rule)
+                new = formula(cols["price"]) if np is not None else [formula(p) for p in cols["price"]]
+                cols["price"] = where_column(mask, new, cols["price"])
+            if 'set_offer' in rule:
+                offer = float(rule['set_offer'])
+                if not 0 <= offer <= 100:
+                    raise ValueError("Offer must be between 0 and 100")
+                cols["offer"] = where_column(mask, [offer] * len(prods) if np is None else offer, cols["offer"])
+        if price_rows:
+            position = {pid: i for i, pid in enumerate(cols["id"])}
+            for pid, price in price_rows.items():
+                if pid in position:
+                    cols["price"][position[pid]] = price
+        return [round(float(p), 2) for p in cols["price"]], [round(float(o), 2) for o in cols["offer"]]
+
+    def parse_price_csv(text):
+        """id,price lines (header optional) -> ({id: price}, {id: row number}, errors)"""
+        prices, lines, errors = {}, {}, []
+        for num, row in enumerate(csv.reader(io.StringIO(text)), start=1):
+            if not row or not ''.join(row).strip():
+                continue
+            try:
+                if len(row) < 2:
+                    raise ValueError("Expected id,price")
+                price = float(row[1])
+                if price < 0:
+                    raise ValueError("Price must not be negative")
+                prices[row[0].strip()] = price
+                lines[row[0].strip()] = num
+            except ValueError as e:
+                if num > 1 or row[0].strip().lower() != 'id':
+                    errors.append({"row": num, "error": str(e)})
+        return prices, lines, errors
+
+    def clean_number(value):
+        return int(value) if float(value).is_integer() else value
+
+    # Spreadsheet catalog import (CSV / XLSX)
+    IMPORT_WORKERS = 4
+
+    def iter_import_rows(stream, filename):
+        """Yield (row number, {header: value}) from a CSV or XLSX upload without loading it whole"""
+        if filename.lower().endswith('.xlsx'):
+            try:
+                from openpyxl import load_workbook
+            except ImportError:
+                raise ValueError("XLSX import needs openpyxl: pip install openpyxl")
+            sheet = load_workbook(stream, read_only=True, data_only=True).active
+            rows = sheet.iter_rows(values_only=True)
+            header = [str(h or '').strip().lower() for h in next(rows, [])]
+            for num, values in enumerate(rows, start=2):
+                if any(v not in (None, '') for v in values):
+                    yield num, dict(zip(header, ['' if v is None else v for v in values]))
+        else:
+            reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+            reader.fieldnames = [str(h or '').strip().lower() for h in (reader.fieldnames or [])]
+            for num, row in enumerate(reader, start=2):
+                if any((v or '').strip() for v in row.values() if isinstance(v, str)):
+                    yield num, row
+
+    def validate_import_row(row, categories):
+        """Check a sheet row against the fields upload() builds; returns (product, image sources)"""
+        title = str(row.get('title') or '').strip()
+        if not title:
+            raise ValueError("Missing title")
+        try:
+            price = float(str(row.get('price') or '').strip())
+        except ValueError:
+            raise ValueError(f"Invalid price: {row.get('price')!r}")
+        if price <= 0:
+            raise ValueError("Price must be greater than 0")
+        try:
+            offer = int(float(str(row.get('offer') or 0).strip() or 0))
+        except ValueError:
+            raise ValueError(f"Invalid offer: {row.get('offer')!r}")
+        if not 0 <= offer <= 100:
+            raise ValueError("Offer must be between 0 and 100")
+        # Like upload(), a missing category becomes 'General'; only a category the sheet names must exist
+        category = str(row.get('category') or '').strip()
+        if category and categories and category not in categories:
+            raise ValueError(f"Unknown category: {category}")
+        category = category or 'General'
+        sources = [s.strip() for s in re.split(r'[|;\n]', str(row.get('images') or row.get('image') or '')) if s.strip()]
+        if not sources:
+            raise ValueError("At least one image is required")
+        product = {
+            "title": title,
+            "price": price,
+            "category": category,
+            "offer": offer,
+            "description": str(row.get('description') or row.get('desc') or '').strip()
+        }
+        return product, sources
+
+    def require_public_url(url):
+        """Refuse hosts that resolve to loopback, private or link-local addresses, so imports cannot reach into the LAN"""
+        host = urlparse(url).hostname
+        if not host:
+            raise ValueError(f"Invalid image URL: {url}")
+        try:
+            addresses = {info[4][0] for info in socket.getaddrinfo(host, None)}
+        except socket.gaierror:
+            raise ValueError(f"Unknown image host: {host}")
+        if not all(ipaddress.ip_address(a.split('%')[0]).is_global for a in addresses):
+            raise ValueError(f"Image URL is not on a public host: {url}")
+
+    def read_image_source(src, base_dir=None, attached=None):
+        """Bytes of an image named in a sheet: an http(s) URL, a file sent with the sheet, or a local
+        path - the last only when base_dir was set server-side (the import CLI)"""
+        if re.match(r'https?://', src, re.I):
+            for _ in range(5):
+                if base_dir is None:
+                    require_public_url(src)
+                res = requests.get(src, timeout=30, allow_redirects=False)
+                if not res.is_redirect:
+                    break
+                src = requests.compat.urljoin(src, res.headers['Location'])
             else:
-                return jsonify({"success": False})
+                raise ValueError(f"Too many redirects: {src}")
+            res.raise_for_status()
+            return res.content
+        name = os.path.basename(src.replace('\\', '/'))
+        if attached and name in attached:
+            return attached[name]
+        if base_dir is None:
+            raise ValueError(f"Image {name} was not uploaded with the sheet")
+        path = src if os.path.isabs(src) else os.path.join(base_dir, src)
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def transcode_to_webp(raw):
+        """Re-encode any Pillow-readable image as WebP, matching the .webp names we store under"""
+        from PIL import Image
+        with Image.open(io.BytesIO(raw)) as img:
+            if img.mode not in ('RGB', 'RGBA'):
+                img = img.convert('RGBA' if 'transparency' in img.info else 'RGB')
+            out = io.BytesIO()
+            img.save(out, format='WEBP', quality=85, method=4)
+        return out.getvalue()
+
+    def import_row_images(conf, product, sources, ts, base_dir=None, attached=None):
+        """Fetch, transcode and push one row's images as blobs; returns {path: blob sha}"""
+        with track_job("import_rows"):
+            return upload_import_images(conf, product, sources, ts, base_dir, attached)
+
+    def upload_import_images(conf, product, sources, ts, base_dir, attached):
+        encoded = [base64.b64encode(transcode_to_webp(read_image_source(src, base_dir, attached))).decode('utf-8')
+                   for src in sources]
+        blobs = {}
+        for i, img_b64 in enumerate(encoded):
+            filename = generate_filename(product['title'], product['description'], ts, f"import_{i}")
+            try:
+                blobs[f"images/{filename}"] = push_blob(conf, img_b64)
+            except RuntimeError as e:
+                raise ValueError(f"Image upload failed: {sources[i]} ({e})")
+        return blobs
+
+    def discard_import_images(conf, blobs):
+        """Remove the images of an import whose catalog write failed, unless the catalog references them after all"""
+        prods, _, _ = fetch_json_file(conf, "all_products.json")
+        if prods is None:
+            logger.warning(f"Could not check the catalog, leaving {len(blobs)} imported images in place")
+            return
+        referenced = {url for p in prods for url in p.get('images', [])}
+        orphans = {fname: None for fname in blobs
+                   if f"https://raw.githubusercontent.com/{conf['repo']}/main/{fname}" not in referenced}
+        if orphans:
+            try:
+                commit_files(conf, orphans, f"Remove {len(orphans)} images of a failed import")
+            except RuntimeError as e:
+                logger.warning(f"Could not remove {len(orphans)} imported images: {e}")
+
+    def import_catalog(conf, rows, base_dir=None, attached=None):
+        """Validate rows, upload their images concurrently and add them all in one catalog write"""
+        errors = []
+        categories = []
+        settings, _, _ = fetch_json_file(conf, "settings.json")
+        if settings:
+            categories = settings.get('categories', [])
+
+        pending = []
+        with ThreadPoolExecutor(max_workers=IMPORT_WORKERS) as pool:
+            try:
+                for num, row in rows:
+                    try:
+                        product, sources = validate_import_row(row, categories)
+                    except ValueError as e:
+                        errors.append({"row": num, "error": str(e)})
+                        continue
+                    row_ts = new_product_id()
+                    future = pool.submit(bind_operation(import_row_images), conf, product, sources, row_ts,
+                                         base_dir, attached)
+                    pending.append((num, row_ts, product, future))
+            except Exception as e:
+                errors.append({"row": None, "error": f"Could not read file: {e}"})
+                # Rows already running only push blobs; nothing is published before commit_files, so nothing to delete
+                for *_, future in pending:
+                    future.cancel()
+                return {"success": False, "imported": 0, "errors": errors}
+
+            items = []
+            blobs = {}
+            for num, row_ts, product, future in pending:
+                try:
+                    row_blobs = future.result()
+                except Exception as e:
+                    errors.append({"row": num, "error": str(e)})
+                    continue
+                blobs.update(row_blobs)
+                urls = [f"https://raw.githubusercontent.com/{conf['repo']}/main/{fname}" for fname in row_blobs]
+                items.append(dict(product, id=row_ts, images=urls, image=urls[0], updated=row_ts))
+
+        errors.sort(key=lambda e: e["row"] or 0)
+        if not items:
+            return {"success": not errors, "imported": 0, "errors": errors}
+
+        def apply(prods):
+            # A retried write must not add the rows twice
+            existing = {p.get('id') for p in prods}
+            return [item for item in items if item['id'] not in existing] + prods
+
+        failed = {"success": False, "imported": 0, "errors": errors + [{"row": None, "error": "Failed to update products"}]}
+        try:
+            commit_files(conf, blobs, f"Upload images for {len(items)} imported products")
+        except RuntimeError:
+            return failed
+        try:
+            old_prods, prods, sha = mutate_json_file(conf, "all_products.json", apply, f"Import {len(items)} products")
+        except RuntimeError:
+            discard_import_images(conf, blobs)
+            return failed
+
+        remember_catalog(conf, prods, sha)
+        publish_search_index(conf, old_prods, prods)
+        logger.info(f"Imported {len(items)} products, {len(errors)} rows rejected")
+        return {"success": True, "imported": len(items), "errors": errors}
+
+    # Templates rendered once, split into hashed CSS/JS assets and pre-compressed
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+
+    ASSET_TYPES = {
+        "html": "text/html; charset=utf-8",
+        "css": "text/css; charset=utf-8",
+        "js": "application/javascript; charset=utf-8"
+    }
+    page_assets = {}
+    compiled_assets = {}
+
+    def make_asset(body, ext):
+        """Identity, gzip and (if available) brotli encodings of one asset plus its ETag"""
+        raw = body.encode('utf-8')
+        digest = hashlib.sha256(raw).hexdigest()[:16]
+        encodings = {"identity": raw, "gzip": gzip.compress(raw, 9)}
+        if brotli is not None:
+            encodings["br"] = brotli.compress(raw, quality=11)
+        return {"digest": digest, "etag": f'"{digest}"', "mimetype": ASSET_TYPES[ext], "encodings": encodings}
+
+    def vendor_url(filename, cdn_url=None):
+        """Bundled copy under /static/vendor (see vendor_assets.py) when present, else the CDN.
+
+        Without a cdn_url the asset is optional (a webfont the CSS falls back from) and None means leave it out."""
+        path = os.path.join(STATIC_DIR, 'vendor', filename)
+        if not os.path.exists(path):
+            if cdn_url is None:
+                logger.warning(f"{filename} is not vendored, leaving it out (run vendor_assets.py)")
+            else:
+                logger.warning(f"{filename} is not vendored, loading it from {cdn_url}")
+            return cdn_url
+        with open(path, 'rb') as f:
+            version = hashlib.sha256(f.read()).hexdigest()[:10]
+        return f"/static/vendor/{filename}?v={version}"
+
+    def compile_page(name, template):
+        """Render a template once and move its inline <style>/<script> blocks out to /assets"""
+        html = flask_app.jinja_env.from_string(template).render(vendor_url=vendor_url)
+
+        def extract(match, ext, tag):
+            asset = make_asset(match.group(1), ext)
+            filename = f"{name}.{asset['digest']}.{ext}"
+            compiled_assets[filename] = asset
+            return tag.format(url=f"/assets/{filename}")
+
+        html = re.sub(r'<style>(.*?)</style>', lambda m: extract(m, "css", '<link rel="stylesheet" href="{url}">'),
+                      html, flags=re.S)
+        html = re.sub(r'<script>(.*?)</script>', lambda m: extract(m, "js", '<script src="{url}"></script>'),
+                      html, flags=re.S)
+        page_assets[name] = make_asset(html, "html")
+
+    def send_asset(asset, cache_control):
+        """Serve the best encoding the client accepts, or 304 when its copy is current"""
+        if asset["etag"] in request.headers.get('If-None-Match', ''):
+            res = flask_app.response_class(status=304)
+        else:
+            accepted = request.headers.get('Accept-Encoding', '')
+            encoding = next((e for e in ("br", "gzip") if e in asset["encodings"] and e in accepted), "identity")
+            res = flask_app.response_class(asset["encodings"][encoding], mimetype=asset["mimetype"])
+            if encoding != "identity":
+                res.headers['Content-Encoding'] = encoding
+        res.headers['ETag'] = asset["etag"]
+        res.headers['Cache-Control'] = cache_control
+        res.headers['Vary'] = 'Accept-Encoding'
+        return res
+
+    with flask_app.app_context():
+        compile_page("setup", SETUP_TEMPLATE)
+        compile_page("admin", ADMIN_TEMPLATE)
+    logger.info(f"Compiled pages: {len(compiled_assets)} static assets")
+
+    # On-the-fly compression of JSON and HTML responses
+    COMPRESS_MIMETYPES = {"application/json", "text/html"}
+    COMPRESS_MIN_BYTES = int(os.environ.get('AXIS_COMPRESS_MIN_BYTES', 1024))
+    GZIP_LEVEL = 5
+    BROTLI_QUALITY = 4
+    compression_stats = {"responses": 0, "bytes_in": 0, "bytes_out": 0, "encode_seconds": 0.0}
+    compression_lock = threading.Lock()
+
+    @flask_app.after_request
+    def compress_response(response):
+        """gzip/brotli JSON and HTML bodies at a latency-friendly level when the client accepts it"""
+        if (response.direct_passthrough or response.is_streamed
+                or response.status_code < 200 or response.status_code in (204, 304)
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESS_MIMETYPES):
+            return response
+        accepted = request.accept_encodings
+        if brotli is not None and accepted['br']:
+            encoding = 'br'
+        elif accepted['gzip']:
+            encoding = 'gzip'
+        else:
+            return response
+        body = response.get_data()
+        if len(body) < COMPRESS_MIN_BYTES:
+            return response
+
+        start = time.perf_counter()
+        if encoding == 'br':
+            compressed = brotli.compress(body, quality=BROTLI_QUALITY)
+        else:
+            compressed = gzip.compress(body, GZIP_LEVEL)
+        elapsed = time.perf_counter() - start
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        response.headers['Content-Length'] = str(len(compressed))
+        response.vary.add('Accept-Encoding')
+        response.headers['Server-Timing'] = f"compress;dur={elapsed * 1000:.2f}"
+        with compression_lock:
+            compression_stats["responses"] += 1
+            compression_stats["bytes_in"] += len(body)
+            compression_stats["bytes_out"] += len(compressed)
+            compression_stats["encode_seconds"] += elapsed
+        return response
+
+    # Idempotency-Key: a retried mutation gets the first attempt's result instead of running again.
+    # Registered after compress_response so results are stored uncompressed (after_request runs in reverse).
+    IDEMPOTENCY_TTL = float(os.environ.get('AXIS_IDEMPOTENCY_TTL', 24 * 3600))
+    IDEMPOTENCY_MAX = int(os.environ.get('AXIS_IDEMPOTENCY_MAX', 1000))
+    IDEMPOTENCY_WAIT = 120
+    idempotency_results = {}
+    idempotency_lock = threading.Lock()
+
+    def idempotency_fingerprint():
+        """Hash of the request body, so a key reused for a different request is refused"""
+        if request.mimetype == 'multipart/form-data':
+            parts = sorted(request.form.items(multi=True)) + sorted(
+                (name, f.filename) for name, f in request.files.items(multi=True))
+            return hashlib.sha256(json.dumps(parts).encode('utf-8')).hexdigest()
+        return hashlib.sha256(request.get_data()).hexdigest()
+
+    def claim_idempotency_key(scope, fingerprint):
+        """Register scope for this request; returns the existing entry if another request holds it"""
+        now = time.time()
+        with idempotency_lock:
+            entry = idempotency_results.get(scope)
+            if entry is not None and entry["expires"] >= now:
+                return entry
+            for key in [k for k, e in idempotency_results.items() if e["expires"] < now]:
+                del idempotency_results[key]
+            if len(idempotency_results) >= IDEMPOTENCY_MAX:
+                finished = [k for k, e in idempotency_results.items() if e["done"].is_set()]
+                for key in finished[:len(idempotency_results) - IDEMPOTENCY_MAX + 1]:
+                    del idempotency_results[key]
+            idempotency_results[scope] = {"fingerprint": fingerprint, "done": threading.Event(),
+                                          "response": None, "expires": now + IDEMPOTENCY_TTL}
+            return None
+
+    def release_idempotency_key(scope, response=None):
+        """Store the result for repeats, or forget the key when the attempt failed so a retry runs again"""
+        with idempotency_lock:
+            entry = idempotency_results.get(scope)
+            if entry is None:
+                return
+            if response is None:
+                del idempotency_results[scope]
+            else:
+                entry["response"] = response
+        entry["done"].set()
+
+    @flask_app.before_request
+    def check_idempotency_key():
+        key = request.headers.get('Idempotency-Key')
+        if not key or request.method not in ('POST', 'PUT', 'PATCH', 'DELETE'):
+            return None
+        scope = (request.path, key)
+        fingerprint = idempotency_fingerprint()
+        while True:
+            entry = claim_idempotency_key(scope, fingerprint)
+            if entry is None:
+                g.idempotency_scope = scope
+                cache_event("idempotency", False)
+                return None
+            if entry["fingerprint"] != fingerprint:
+                return jsonify({"success": False, "error": "Idempotency-Key was already used for a different request"}), 422
+            if not entry["done"].wait(IDEMPOTENCY_WAIT):
+                return jsonify({"success": False, "error": "A request with this Idempotency-Key is still running"}), 409
+            if entry["response"] is not None:
+                body, status, mimetype = entry["response"]
+                cache_event("idempotency", True)
+                logger.info(f"Replaying stored result for Idempotency-Key {key}")
+                return Response(body, status=status, mimetype=mimetype, headers={'Idempotent-Replayed': 'true'})
+            # the first attempt failed and gave the key back; run this one for real
+
+    @flask_app.after_request
+    def store_idempotent_result(response):
+        scope = g.pop('idempotency_scope', None)
+        if scope is None:
+            return response
+        result = None
+        if not (response.direct_passthrough or response.is_streamed) and response.status_code < 400:
+            payload = response.get_json(silent=True) if response.is_json else None
+            if not (isinstance(payload, dict) and payload.get('success') is False):
+                result = (response.get_data(), response.status_code, response.mimetype)
+        release_idempotency_key(scope, result)
+        return response
+
+    @flask_app.teardown_request
+    def abandon_idempotency_key(exc):
+        scope = g.pop('idempotency_scope', None)
+        if scope is not None:
+            release_idempotency_key(scope)
+
+    @flask_app.route('/')
+    def home():
+        logger.info("Home route accessed")
+        try:
+            # The page itself revalidates (cheap 304); the hashed assets it links never change
+            page = page_assets["admin" if get_config() else "setup"]
+            return send_asset(page, 'no-cache')
         except Exception as e:
-            logger.error(f"Upload error: {e}")
+            logger.error(f"Error in home route: {e}")
+            return f"Error loading application: {e}"
+
+    @flask_app.route('/assets/<filename>')
+    def asset(filename):
+        found = compiled_assets.get(filename)
+        if not found:
+            return jsonify({"success": False, "error": "Not found"}), 404
+        return send_asset(found, 'public, max-age=31536000, immutable')
+
+    @flask_app.route('/api/metrics')
+    def metrics():
+        snap = metrics_snapshot()
+        if request.args.get('format') == 'prometheus':
+            return Response(prometheus_text(snap), mimetype='text/plain; version=0.0.4')
+        return jsonify(snap)
+
+    @flask_app.route('/api/traces')
+    def traces():
+        """Most recent request traces, newest first; ?route= filters, ?slow= keeps those over N ms"""
+        route = request.args.get('route')
+        slow = float(request.args.get('slow', 0) or 0)
+        limit = min(max(int(request.args.get('limit', 50)), 1), recent_traces.maxlen)
+        found = [t for t in reversed(recent_traces)
+                 if (not route or t["name"] == route) and (t["ms"] or 0) >= slow]
+        return jsonify({"traces": found[:limit], "file": TRACE_FILE})
+
+    @flask_app.route('/api/profile', methods=['GET', 'POST'])
+    def profile():
+        if not is_local_request():
+            return jsonify({"success": False, "error": "Profiling is only available on this machine"}), 403
+        try:
+            if request.method == 'POST':
+                data = request.json or {}
+                route = data.get('route', '')
+                mode = data.get('mode', 'cprofile')
+                if route not in flask_app.view_functions:
+                    return jsonify({"success": False, "error": f"Unknown route: {route}"})
+                if mode not in PROFILE_MODES:
+                    return jsonify({"success": False, "error": f"mode must be one of {', '.join(PROFILE_MODES)}"})
+                count = max(int(data.get('count', 1)), 0)
+                with metrics_lock:
+                    if count:
+                        profile_plan[route] = {"count": count, "mode": mode}
+                    else:
+                        profile_plan.pop(route, None)
+                logger.info(f"Profiling next {count} requests to {route} ({mode})")
+            files = []
+            if os.path.isdir(PROFILE_DIR):
+                for name in sorted(os.listdir(PROFILE_DIR), reverse=True):
+                    if name.endswith(('.prof', '.folded')):
+                        st = os.stat(os.path.join(PROFILE_DIR, name))
+                        files.append({"name": name, "bytes": st.st_size, "created": int(st.st_mtime*1000)})
+            with metrics_lock:
+                armed = {k: dict(v) for k, v in profile_plan.items()}
+            return jsonify({"success": True, "armed": armed, "files": files})
+        except Exception as e:
+            logger.error(f"Profile error: {e}")
             return jsonify({"success": False, "error": str(e)})
 
-    @flask_app.route('/api/upload-bulk', methods=['POST'])
-    def upload_bulk():
-        logger.info("Bulk upload API called")
+    @flask_app.route('/api/profile/<name>')
+    def profile_file(name):
+        if not is_local_request():
+            return jsonify({"success": False, "error": "Profiling is only available on this machine"}), 403
+        if not name.endswith(('.prof', '.folded')) or not os.path.isfile(os.path.join(PROFILE_DIR, os.path.basename(name))):
+            return jsonify({"success": False, "error": "Not found"}), 404
+        top = request.args.get('top')
+        if not top:
+            return send_from_directory(PROFILE_DIR, name, as_attachment=True)
+        if name.endswith('.folded'):
+            return Response(folded_summary(os.path.join(PROFILE_DIR, name), int(top)), mimetype='text/plain')
+        out = io.StringIO()
+        stats = pstats.Stats(os.path.join(PROFILE_DIR, name), stream=out)
+        stats.sort_stats(request.args.get('sort', 'cumulative')).print_stats(int(top))
+        return Response(out.getvalue(), mimetype='text/plain')
+
+    @flask_app.route('/api/setup', methods=['POST'])
+    def setup():
+        logger.info("Setup API called")
         try:
-            with open(CONFIG_FILE, 'r') as f: 
-                conf = json.load(f)
-            
             data = request.json
-            edit_idx = int(data.get('editIndex', -1))
+            if not data or 'repo' not in data or 'token' not in data:
+                return jsonify({"success": False, "error": "Missing repository or token"})
             
-            # Get existing products
-            res = github_api("GET", f"{conf['repo']}/contents/all_products.json", conf['token'])
+            res = github_api("GET", f"{data['repo']}", data['token'])
             if res and res.status_code == 200:
-                prods = json.loads(base64.b64decode(res.json()['content']).decode('utf-8'))
-                sha = res.json()['sha']
+                save_config(data)
+                logger.info("Configuration saved")
+                return jsonify({"success": True})
             else:
-                prods = []
-                sha = None
+                return jsonify({"success": False, "error": "Invalid credentials"})
+        except Exception as e:
+            logger.error(f"Setup error: {e}")
+            return jsonify({"success": False, "error": str(e)})
 
-            prod = data['product']
-            ts = int(time.time()*1000)
+    @flask_app.route('/api/get-data')
+    def get_data():
+        logger.info("Get data API called")
+        try:
+            conf = get_config()
+            if not conf: 
+                return jsonify({})
             
-            # Handle new images for bulk upload
-            new_images_base64 = prod.get('newImages', [])
-            new_image_urls = []
-            
-            for i, img_b64 in enumerate(new_images_base64):
-                time.sleep(0.3)
-                # Generate consistent filename using title, description, timestamp
-                filename = generate_filename(
-                    prod.get('title', 'product'),
-                    prod.get('description', ''),
-                    ts,
-                    f"bulk_{i}"
-                )
-                fname = f"images/{filename}"
-                upload_res = github_api("PUT", f"{conf['repo']}/contents/{fname}", conf['token'], {
-                    "message": "Upload product image",
-                    "content": img_b64
-                })
-                if upload_res and upload_res.status_code in [200, 201]:
-                    new_image_urls.append(f"https://raw.githubusercontent.com/{conf['repo']}/main/{fname}")
+            # Serve the saved snapshot and revalidate behind it; go to GitHub first only without one
+            snap = get_snapshot(conf['repo'])
+            if request.args.get('refresh') or not snap["files"]:
+                revalidate_snapshot(conf)
+            else:
+                refresh_in_background(conf)
+            with snapshot_lock:
+                files = {p: snap["files"].get(p) or {} for p in SNAPSHOT_FILES}
+
+            # Get products
+            prods = files["all_products.json"].get("data") or []
+            if files["all_products.json"].get("sha"):
+                remember_catalog(conf, prods, files["all_products.json"]["sha"])
+            logger.info(f"Loaded {len(prods)} products")
             
-            # Create product object (buyLink removed)
-            item = {
-                "id": ts,
-                "title": prod.get('title', ''),
-                "price": prod.get('price', 0),
-                "category": prod.get('category', 'General'),
-                "offer": prod.get('offer', 0),
-                "description": prod.get('description', ''),
-                "images": new_image_urls,
-                "image": new_image_urls[0] if new_image_urls else ""
-            }
+            # Get categories and whatsapp number from settings.json
+            settings = files["settings.json"].get("data")
+            settings = settings if isinstance(settings, dict) else {}
+            cats = settings.get('categories', [])
+            whatsapp = settings.get('whatsappNumber', '')
             
-            # Always add as new product in bulk upload
-            prods.insert(0, item)
-            logger.info("Added new product via bulk upload")
-            
-            # Update products file
-            content = base64.b64encode(json.dumps(prods, indent=2).encode('utf-8')).decode('utf-8')
-            update_res = github_api("PUT", f"{conf['repo']}/contents/all_products.json", conf['token'], {
-                "message": "Bulk upload products",
-                "content": content, 
-                "sha": sha
+            # Get banners
+            banner_list = files["banners.json"].get("data") or []
+            logger.info(f"Loaded {len(banner_list)} banners")
+            
+            return jsonify({"products": prods, "categories": cats, "banners": banner_list, "whatsapp": whatsapp,
+                            "sync": sync_status(snap)})
+        except Exception as e:
+            logger.error(f"Get data error: {e}")
+            return jsonify({"products": [], "categories": [], "banners": [], "whatsapp": ""})
+
+    @flask_app.route('/api/sync-status')
+    def sync_state():
+        conf = get_config()
+        if not conf:
+            return jsonify({})
+        status = sync_status(get_snapshot(conf['repo']))
+        if status["queue"]["pending"] and not status["queue"]["replaying"]:
+            start_replayer()
+        return jsonify(status)
+
+    @flask_app.route('/api/products')
+    def list_products():
+        logger.info("Products query API called")
+        try:
+            conf = get_config()
+            if not conf:
+                return jsonify({"success": False, "error": "Not configured"})
+
+            q = request.args.get('q', '').strip()
+            category = request.args.get('category', '').strip()
+            sort = request.args.get('sort', '').strip()
+            offset = max(int(request.args.get('cursor') or 0), 0)
+            limit = min(max(int(request.args.get('limit') or 50), 1), 200)
+
+            catalog = load_catalog(conf)
+            with catalog_lock:
+                qi = catalog["index"]
+                ids = query_products(qi, q, category, sort)
+                items = []
+                for pid in ids[offset:offset + limit]:
+                    item = dict(qi["by_id"][pid])
+                    item["index"] = qi["position"][pid]
+                    items.append(item)
+
+            next_offset = offset + limit
+            return jsonify({
+                "success": True,
+                "items": items,
+                "total": len(ids),
+                "nextCursor": str(next_offset) if next_offset < len(ids) else None
             })
+        except Exception as e:
+            logger.error(f"Products query error: {e}")
+            return jsonify({"success": False, "error": str(e)})
+
+    @flask_app.route('/api/export')
+    def export_products():
+        logger.info("Export API called")
+        try:
+            conf = require_config()
+
+            fmt = request.args.get('format', 'csv').lower()
+            if fmt not in ('csv', 'ndjson'):
+                return jsonify({"success": False, "error": "format must be csv or ndjson"})
+            category = request.args.get('category', '').strip()
+            since = int(request.args.get('since') or 0)
+
+            prods = load_catalog(conf, refresh=True)["products"]
+            version = max((product_version(p) for p in prods), default=0)
+            return Response(
+                stream_with_context(export_rows(prods, fmt, category, since)),
+                mimetype='text/csv' if fmt == 'csv' else 'application/x-ndjson',
+                headers={
+                    "Content-Disposition": f"attachment; filename=products.{fmt}",
+                    "X-Catalog-Version": str(version)
+                }
+            )
+        except Exception as e:
+            logger.error(f"Export error: {e}")
+            return jsonify({"success": False, "error": str(e)})
+
+    @flask_app.route('/api/update-settings', methods=['POST'])
+    def update_settings():
+        logger.info("Update settings API called")
+        try:
+            conf = require_config()
             
-            if update_res and update_res.status_code in [200, 201]:
-                return jsonify({"success": True})
-            else:
-                return jsonify({"success": False})
+            data = request.json
+            whatsapp_number = data.get('whatsappNumber', '')
+            
+            # Update whatsapp number, keeping the rest of settings.json
+            def apply(settings):
+                settings['whatsappNumber'] = whatsapp_number
+                return settings
+
+            try:
+                mutate_json_file(conf, "settings.json", apply, "Update WhatsApp number", default=lambda: {"categories": []})
+            except RuntimeError:
+                return jsonify({"success": False, "error": "Failed to update settings"})
+            return jsonify({"success": True})
+        except Exception as e:
+            logger.error(f"Update settings error: {e}")
+            return jsonify({"success": False, "error": str(e)})
+
+    @flask_app.route('/api/update-cats', methods=['POST'])
+    def update_cats():
+        logger.info("Update categories API called")
+        try:
+            conf = require_config()
+            
+            categories = request.json['categories']
+
+            # Update only categories in settings
+            def apply(settings):
+                settings['categories'] = categories
+                return settings
+
+            mutate_json_file(conf, "settings.json", apply, "Update categories", default=dict)
+            return jsonify({"success": True})
+        except Exception as e:
+            logger.error(f"Update categories error: {e}")
+            return jsonify({"success": False})
+
+    @flask_app.route('/api/upload', methods=['POST'])
+    def upload():
+        logger.info("Upload API called")
+        try:
+            conf = require_config()
+            return jsonify(submit_product_change(conf, "upload", request.json))
+        except MutationRejected as e:
+            return jsonify({"success": False, "error": str(e)})
+        except Exception as e:
+            logger.error(f"Upload error: {e}")
+            return jsonify({"success": False, "error": str(e)})
+
+    @flask_app.route('/api/upload-bulk', methods=['POST'])
+    def upload_bulk():
+        logger.info("Bulk upload API called")
+        try:
+            conf = require_config()
+            # Always add as new product in bulk upload
+            return jsonify(submit_product_change(conf, "upload_bulk", request.json))
         except Exception as e:
             logger.error(f"Bulk upload error: {e}")
             return jsonify({"success": False, "error": str(e)})
 
+    @flask_app.route('/api/import', methods=['POST'])
+    def import_products():
+        logger.info("Import API called")
+        try:
+            conf = require_config()
+
+            upload_file = request.files.get('file')
+            if not upload_file or not upload_file.filename:
+                return jsonify({"success": False, "error": "No file provided"})
+            if not upload_file.filename.lower().endswith(('.csv', '.xlsx')):
+                return jsonify({"success": False, "error": "Only .csv and .xlsx files are supported"})
+
+            # Images come as URLs or as files sent with the sheet; local paths only from the CLI
+            attached = {os.path.basename(f.filename): f.read() for f in request.files.getlist('images') if f.filename}
+            rows = iter_import_rows(upload_file.stream, upload_file.filename)
+            return jsonify(import_catalog(conf, rows, flask_app.config.get('AXIS_IMPORT_BASE_DIR'), attached))
+        except Exception as e:
+            logger.error(f"Import error: {e}")
+            return jsonify({"success": False, "error": str(e)})
+
+    @flask_app.route('/api/bulk-pricing', methods=['POST'])
+    def bulk_pricing():
+        logger.info("Bulk pricing API called")
+        try:
+            conf = require_config()
+
+            data = request.json or {}
+            rules = data.get('rules', [])
+            price_rows, price_lines, errors = parse_price_csv(data.get('csv', ''))
+            if errors:
+                return jsonify({"success": False, "error": "Invalid price CSV", "errors": errors})
+
+            def unknown_ids(prods):
+                known = {str(p.get('id')) for p in prods if p.get('id') is not None}
+                return [{"row": price_lines[pid], "error": f"Unknown product id: {pid}"}
+                        for pid in price_rows if pid not in known]
+
+            def price_changes(prods):
+                prices, offers = evaluate_pricing(prods, rules, price_rows)
+                changes = []
+                for i, (prod, price, offer) in enumerate(zip(prods, prices, offers)):
+                    old_price, old_offer = to_number(prod.get('price', 0)), to_number(prod.get('offer', 0))
+                    if price != round(old_price, 2) or offer != round(old_offer, 2):
+                        changes.append({
+                            "index": i,
+                            "id": prod.get('id'),
+                            "title": prod.get('title', ''),
+                            "price": [clean_number(old_price), clean_number(price)],
+                            "offer": [clean_number(old_offer), clean_number(offer)]
+                        })
+                return changes
+
+            prods, sha, _ = fetch_json_file(conf, "all_products.json")
+            if prods is None:
+                return jsonify({"success": False, "error": "Failed to load products"})
+            if data.get('apply') and data.get('sha') and data['sha'] != sha:
+                return jsonify({"success": False, "error": "Products changed since the preview, preview again"})
+            errors = unknown_ids(prods)
+            if errors:
+                return jsonify({"success": False, "error": "Invalid price CSV", "errors": errors})
+
+            changes = price_changes(prods)
+            if not data.get('apply') or not changes:
+                return jsonify({"success": True, "applied": False, "sha": sha, "changes": changes})
+
+            def same_effect(a, b):
+                return [(c["id"], c["price"], c["offer"]) for c in a] == [(c["id"], c["price"], c["offer"]) for c in b]
+
+            ts = int(time.time()*1000)
+
+            def apply(prods):
+                # Another write may have landed since the read above; the rules must still do exactly the same
+                nonlocal changes
+                if unknown_ids(prods):
+                    raise MutationRejected("A product in the price CSV no longer exists, preview again")
+                fresh = price_changes(prods)
+                if data.get('sha') and not same_effect(fresh, changes):
+                    raise MutationRejected("Products changed since the preview, preview again")
+                changes = fresh
+                for change in changes:
+                    i = change["index"]
+                    prods[i] = dict(prods[i], price=change["price"][1], offer=change["offer"][1], updated=ts)
+                return prods
+
+            old_prods, prods, sha = mutate_json_file(
+                conf, "all_products.json", apply, f"Bulk pricing: {len(changes)} products")
+            remember_catalog(conf, prods, sha)
+            publish_search_index(conf, old_prods, prods)
+            logger.info(f"Bulk pricing updated {len(changes)} products")
+            return jsonify({"success": True, "applied": True, "changes": changes})
+        except MutationRejected as e:
+            return jsonify({"success": False, "error": str(e)})
+        except (ValueError, TypeError, KeyError) as e:
+            return jsonify({"success": False, "error": f"Invalid rule: {e}"})
+        except Exception as e:
+            logger.error(f"Bulk pricing error: {e}")
+            return jsonify({"success": False, "error": str(e)})
+
     @flask_app.route('/api/upload-banner', methods=['POST'])
     def upload_banner():
         logger.info("Upload banner API called")
         try:
-            with open(CONFIG_FILE, 'r') as f: 
-                conf = json.load(f)
+            conf = require_config()
             
             data = request.json
             image_b64 = data.get('image', '')
@@ -2993,15 +5443,6 @@ def start_my_app():
             if not image_b64:
                 return jsonify({"success": False, "error": "No image provided"})
             
-            # Get existing banners
-            res = github_api("GET", f"{conf['repo']}/contents/banners.json", conf['token'])
-            if res and res.status_code == 200:
-                banners = json.loads(base64.b64decode(res.json()['content']).decode('utf-8'))
-                sha = res.json()['sha']
-            else:
-                banners = []
-                sha = None
-            
             # Generate consistent filename for banner
             ts = int(time.time()*1000)
             filename = generate_filename(
@@ -3019,22 +5460,16 @@ def start_my_app():
             if upload_res and upload_res.status_code in [200, 201]:
                 image_url = f"https://raw.githubusercontent.com/{conf['repo']}/main/{fname}"
                 
-                # Add new banner to list
-                banners.append({
-                    "image": image_url,
-                    "link": link
-                })
-                
-                # Update banners file
-                content = base64.b64encode(json.dumps(banners, indent=2).encode('utf-8')).decode('utf-8')
-                update_res = github_api("PUT", f"{conf['repo']}/contents/banners.json", conf['token'], {
-                    "message": "Add banner",
-                    "content": content, 
-                    "sha": sha
-                })
-                
-                if update_res and update_res.status_code in [200, 201]:
-                    return jsonify({"success": True})
+                # Add new banner to list; a retried write must not add it twice
+                banner = {"image": image_url, "link": link}
+
+                def apply(banners):
+                    if any(b.get('image') == image_url for b in banners):
+                        return banners
+                    return banners + [banner]
+
+                mutate_json_file(conf, "banners.json", apply, "Add banner")
+                return jsonify({"success": True})
             
             return jsonify({"success": False})
         except Exception as e:
@@ -3045,39 +5480,38 @@ def start_my_app():
     def delete_banner():
         logger.info("Delete banner API called")
         try:
-            with open(CONFIG_FILE, 'r') as f: 
-                conf = json.load(f)
+            conf = require_config()
             
             idx = request.json.get('index', -1)
             if idx == -1:
                 return jsonify({"success": False, "error": "Invalid index"})
             
-            # Get existing banners
-            res = github_api("GET", f"{conf['repo']}/contents/banners.json", conf['token'])
-            if res and res.status_code == 200:
-                banners = json.loads(base64.b64decode(res.json()['content']).decode('utf-8'))
-                sha = res.json()['sha']
-                
-                if 0 <= idx < len(banners):
-                    # Delete the image file from GitHub
-                    banner = banners[idx]
-                    path = extract_image_path_from_url(banner['image'], conf['repo'])
-                    if path:
-                        delete_file_from_github(path, conf['token'], conf['repo'])
-                    
-                    banners.pop(idx)
-                    
-                    content = base64.b64encode(json.dumps(banners, indent=2).encode('utf-8')).decode('utf-8')
-                    del_res = github_api("PUT", f"{conf['repo']}/contents/banners.json", conf['token'], {
-                        "message": "Delete banner",
-                        "content": content, 
-                        "sha": sha
-                    })
-                    
-                    if del_res and del_res.statusCode in [200, 201]:
-                        return jsonify({"success": True})
-            
-            return jsonify({"success": False, "error": "Banner not found"})
+            image = request.json.get('image')
+            removed = []
+
+            def apply(banners):
+                if removed:
+                    # A retry: the earlier write may have landed, and an index may now name another banner
+                    if removed[0] not in banners:
+                        return banners
+                    if not image and banners[idx:idx + 1] != removed:
+                        raise MutationRejected("Banners changed during the delete, reload and try again")
+                # Banners have no id; the image URL identifies one when the client sends it
+                pos = next((i for i, b in enumerate(banners) if b.get('image') == image), -1) if image else idx
+                if not 0 <= pos < len(banners):
+                    raise MutationRejected("Banner not found")
+                removed[:] = [banners.pop(pos)]
+                return banners
+
+            mutate_json_file(conf, "banners.json", apply, "Delete banner")
+
+            # Delete the image file from GitHub
+            path = extract_image_path_from_url(removed[0]['image'], conf['repo'])
+            if path:
+                delete_file_from_github(path, conf['token'], conf['repo'])
+            return jsonify({"success": True})
+        except MutationRejected as e:
+            return jsonify({"success": False, "error": str(e)})
         except Exception as e:
             logger.error(f"Delete banner error: {e}")
             return jsonify({"success": False, "error": str(e)})
@@ -3086,45 +5520,50 @@ def start_my_app():
     def delete():
         logger.info("Delete API called")
         try:
-            with open(CONFIG_FILE, 'r') as f: 
-                conf = json.load(f)
+            conf = require_config()
             
             idx = request.json.get('index', -1)
-            if idx == -1:
+            product_id = request.json.get('id')
+            if idx == -1 and product_id is None:
                 return jsonify({"success": False, "error": "Invalid index"})
-            
-            res = github_api("GET", f"{conf['repo']}/contents/all_products.json", conf['token'])
-            if res and res.status_code == 200:
-                prods = json.loads(base64.b64decode(res.json()['content']).decode('utf-8'))
-                sha = res.json()['sha']
-                
-                if 0 <= idx < len(prods):
-                    # Delete all image files associated with this product
-                    product = prods[idx]
-                    image_urls = []
-                    if product.get('images'):
-                        image_urls = product['images']
-                    elif product.get('image'):
-                        image_urls = [product['image']]
-                    
-                    for img_url in image_urls:
-                        path = extract_image_path_from_url(img_url, conf['repo'])
-                        if path:
-                            delete_file_from_github(path, conf['token'], conf['repo'])
-                    
-                    prods.pop(idx)
-                    
-                    content = base64.b64encode(json.dumps(prods, indent=2).encode('utf-8')).decode('utf-8')
-                    del_res = github_api("PUT", f"{conf['repo']}/contents/all_products.json", conf['token'], {
-                        "message": "Delete product",
-                        "content": content, 
-                        "sha": sha
-                    })
-                    
-                    if del_res and del_res.status_code in [200, 201]:
-                        return jsonify({"success": True})
-            
-            return jsonify({"success": False, "error": "Product not found"})
+
+            removed = []
+
+            def apply(prods):
+                if removed:
+                    # A retry: the earlier write may have landed, and an index may now name another product
+                    if product_id is not None:
+                        gone = all(p.get('id') != product_id for p in prods)
+                    else:
+                        gone = removed[0] not in prods
+                    if gone:
+                        return prods
+                    if product_id is None and prods[idx:idx + 1] != removed:
+                        raise MutationRejected("Products changed during the delete, reload and try again")
+                removed[:] = [prods.pop(locate_product(prods, product_id, idx))]
+                return prods
+
+            old_prods, prods, sha = mutate_json_file(conf, "all_products.json", apply, "Delete product")
+            remember_catalog(conf, prods, sha)
+
+            # Delete all image files associated with this product, now that nothing references them
+            product = removed[0]
+            image_urls = []
+            if product.get('images'):
+                image_urls = product['images']
+            elif product.get('image'):
+                image_urls = [product['image']]
+
+            with span("delete images", count=len(image_urls)):
+                for img_url in image_urls:
+                    path = extract_image_path_from_url(img_url, conf['repo'])
+                    if path:
+                        delete_file_from_github(path, conf['token'], conf['repo'])
+
+            publish_search_index(conf, old_prods, prods)
+            return jsonify({"success": True})
+        except MutationRejected as e:
+            return jsonify({"success": False, "error": str(e)})
         except Exception as e:
             logger.error(f"Delete error: {e}")
             return jsonify({"success": False, "error": str(e)})
@@ -3133,25 +5572,81 @@ def start_my_app():
     def logout():
         logger.info("Logout API called")
         try:
-            if os.path.exists(CONFIG_FILE): 
-                os.remove(CONFIG_FILE)
+            clear_config()
+            drop_snapshots()
             return jsonify({"success": True})
         except Exception as e:
             logger.error(f"Logout error: {e}")
             return jsonify({"success": False})
 
+    def make_threadpool_server(host, port, threads, connection_limit):
+        """Bundled pure-Python server: fixed worker pool, 503 once connection_limit is reached"""
+        from wsgiref.simple_server import WSGIServer, WSGIRequestHandler, make_server
+
+        class QuietHandler(WSGIRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+        class ThreadPoolWSGIServer(WSGIServer):
+            request_queue_size = connection_limit
+
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="axis-http")
+                self.slots = threading.BoundedSemaphore(connection_limit)
+
+            def process_request(self, req, client_address):
+                if not self.slots.acquire(blocking=False):
+                    try:
+                        req.sendall(b"HTTP/1.1 503 Service Unavailable\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                    finally:
+                        self.shutdown_request(req)
+                    return
+                self.pool.submit(self.process_request_thread, req, client_address)
+
+            def process_request_thread(self, req, client_address):
+                try:
+                    self.finish_request(req, client_address)
+                except Exception:
+                    self.handle_error(req, client_address)
+                finally:
+                    self.shutdown_request(req)
+                    self.slots.release()
+
+        return make_server(host, port, flask_app, server_class=ThreadPoolWSGIServer, handler_class=QuietHandler)
+
     def run_flask():
         try:
-            print("Starting App on http://127.0.0.1:5000")
+            print(f"Starting App on {APP_URL} ({SERVER_BACKEND})")
             print("Open your browser and go to the above URL")
             
             import werkzeug.serving
-            werkzeug_log = logging.getLogger('werkzeug')
-            werkzeug_log.setLevel(logging.ERROR)
+            if 'werkzeug' not in LOG_LEVELS:
+                logging.getLogger('werkzeug').setLevel(logging.ERROR)
             
+            if SERVER_BACKEND == 'waitress':
+                try:
+                    from waitress import serve as waitress_serve
+                    waitress_serve(
+                        flask_app,
+                        host=SERVER_HOST,
+                        port=SERVER_PORT,
+                        threads=SERVER_THREADS,
+                        connection_limit=SERVER_CONNECTION_LIMIT,
+                        max_request_body_size=SERVER_MAX_BODY_MB * 1024 * 1024
+                    )
+                    return
+                except ImportError:
+                    logger.warning("waitress is not installed, falling back to the Werkzeug server")
+            elif SERVER_BACKEND == 'threadpool':
+                make_threadpool_server(SERVER_HOST, SERVER_PORT, SERVER_THREADS, SERVER_CONNECTION_LIMIT).serve_forever()
+                return
+            elif SERVER_BACKEND != 'werkzeug':
+                logger.warning(f"Unknown server backend '{SERVER_BACKEND}', using the Werkzeug server")
+
             flask_app.run(
-                host='127.0.0.1',
-                port=5000,
+                host=SERVER_HOST,
+                port=SERVER_PORT,
                 debug=False,
                 threaded=True,
                 use_reloader=False
@@ -3160,19 +5655,58 @@ def start_my_app():
             logger.error(f"Failed to start Flask: {e}")
             print(f"Error: {e}")
 
+    if not serve:
+        return flask_app
+
     flask_thread = Thread(target=run_flask, daemon=True)
     flask_thread.start()
+
+    # Warm the snapshot so the first dashboard load does not wait on GitHub
+    startup_conf = get_config()
+    if startup_conf:
+        refresh_in_background(startup_conf)
+
+    # Push anything queued while GitHub was unreachable last time
+    if journal_status()["pending"]:
+        start_replayer()
     
     time.sleep(2)
     
-    webbrowser.open("http://127.0.0.1:5000")
+    if OPEN_BROWSER:
+        webbrowser.open(APP_URL)
     
     print("\nApp is now running!")
-    print("Access at: http://127.0.0.1:5000")
+    print(f"Access at: {APP_URL}")
     print("Check run.log for detailed logs")
     
     try:
         while flask_thread.is_alive():
             time.sleep(1)
     except KeyboardInterrupt:
-        print("\nShutting down App...")
\ No newline at end of file
+        print("\nShutting down App...")
+
+
+def run_import_cli(argv):
+    """python app.py import <file.csv|file.xlsx> - import a spreadsheet through /api/import"""
+    import os
+    import json
+    if len(argv) != 1:
+        print("Usage: python app.py import <file.csv|file.xlsx>")
+        return 2
+    path = os.path.abspath(argv[0])
+    flask_app = start_my_app(serve=False)
+    # Image paths in the sheet are read relative to it; the HTTP route never gets this setting
+    flask_app.config['AXIS_IMPORT_BASE_DIR'] = os.path.dirname(path)
+    client = flask_app.test_client()
+    with open(path, 'rb') as f:
+        res = client.post('/api/import', data={"file": (f, os.path.basename(path))})
+    report = res.get_json()
+    print(json.dumps(report, indent=2))
+    return 0 if report.get('success') and not report.get('errors') else 1
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 1 and sys.argv[1] == "import":
+        sys.exit(run_import_cli(sys.argv[2:]))
+    start_my_app()
@@ -0,0 +1,243 @@
+"""Benchmark the admin API routes end to end against the fake GitHub backend.
+
+The Flask app runs in-process (test client) with AXIS_GITHUB_API pointed at
+benchmarks/fake_github.py. For every catalog size a fresh repo is seeded and
+each operation is repeated; results include latency percentiles, GitHub calls
+and bytes per operation and peak RSS while the operation ran.
+
+    python benchmarks/admin_ops.py --sizes 100 1000 10000 50000 --repeat 10 --json > before.json
+    python benchmarks/admin_ops.py --ops get_data delete --sizes 1000 --latency 0.05
+"""
+import argparse
+import base64
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from fake_github import FakeGitHub, serve  # noqa: E402
+
+OPERATIONS = ["get_data", "upload_1", "upload_5", "upload_10", "upload_bulk", "delete",
+              "upload_banner", "delete_banner"]
+SEED_BANNERS = 5
+
+
+def current_rss():
+    """Resident set size in bytes, or None where it cannot be read"""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class RssSampler:
+    """Polls RSS on a thread while the block runs and keeps the maximum"""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.peak = None
+        self.stop = threading.Event()
+
+    def poll(self):
+        while not self.stop.is_set():
+            rss = current_rss()
+            if rss is not None:
+                self.peak = max(self.peak or 0, rss)
+            self.stop.wait(self.interval)
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self.poll, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop.set()
+        self.thread.join()
+
+
+def make_product(i, repo):
+    return {
+        "id": 1700000000000 + i,
+        "title": f"Product {i}",
+        "price": round(100 + (i * 37) % 9000, 2),
+        "category": f"Category {i % 12}",
+        "offer": (i * 7) % 40,
+        "description": f"Bench product number {i} with a short description for search and export.",
+        "images": [f"https://raw.githubusercontent.com/{repo}/main/images/p{i}.webp"],
+        "image": f"https://raw.githubusercontent.com/{repo}/main/images/p{i}.webp",
+        "updated": 1700000000000 + i
+    }
+
+
+def seed_repo(fake, repo, size, image_bytes):
+    """Catalog of `size` products, settings and banners; only the first images exist as files"""
+    prods = [make_product(i, repo) for i in range(size)]
+    files = {
+        "all_products.json": json.dumps(prods, indent=2).encode("utf-8"),
+        "settings.json": json.dumps({"categories": [f"Category {i}" for i in range(12)],
+                                     "whatsappNumber": "911234567890"}).encode("utf-8"),
+        "banners.json": json.dumps([{"image": f"https://raw.githubusercontent.com/{repo}/main/banners/b{i}.webp",
+                                     "link": ""} for i in range(SEED_BANNERS)]).encode("utf-8"),
+    }
+    for i in range(min(size, 200)):
+        files[f"images/p{i}.webp"] = image_bytes
+    for i in range(SEED_BANNERS):
+        files[f"banners/b{i}.webp"] = image_bytes
+    fake.put_files(repo, files, "Seed benchmark catalog")
+
+
+def product_payload(n_images, image_b64, i):
+    return {
+        "editIndex": -1,
+        "product": {
+            "title": f"Bench upload {i}",
+            "price": 499.0,
+            "category": "Category 1",
+            "offer": 10,
+            "description": "Uploaded by the benchmark",
+            "existingImages": [],
+            "removedImages": [],
+            "newImages": [image_b64] * n_images
+        }
+    }
+
+
+def request_for(op, i, image_b64, fake, repo):
+    """(method, url, json body) for one run of op"""
+    if op == "get_data":
+        return "GET", "/api/get-data", None
+    if op.startswith("upload_") and op[7:].isdigit():
+        return "POST", "/api/upload", product_payload(int(op[7:]), image_b64, i)
+    if op == "upload_bulk":
+        return "POST", "/api/upload-bulk", product_payload(1, image_b64, i)
+    if op == "delete":
+        return "POST", "/api/delete", {"index": 0}
+    if op == "upload_banner":
+        return "POST", "/api/upload-banner", {"image": image_b64, "link": f"https://example.com/{i}"}
+    if op == "delete_banner":
+        banners = json.loads(fake.read_file(repo, "banners.json") or b"[]")
+        return "POST", "/api/delete-banner", {"index": max(len(banners) - 1, 0)}
+    raise ValueError(f"Unknown operation: {op}")
+
+
+def percentile(values, p):
+    return round(values[min(int(len(values) * p), len(values) - 1)] * 1000, 2) if values else None
+
+
+def run_op(client, fake, repo, op, repeat, image_b64):
+    latencies, failures, bytes_out, bytes_in = [], 0, 0, 0
+    fake.reset_stats()
+    with RssSampler() as rss:
+        for i in range(repeat):
+            method, url, body = request_for(op, i, image_b64, fake, repo)
+            start = time.perf_counter()
+            res = client.open(url, method=method, json=body)
+            latencies.append(time.perf_counter() - start)
+            data = res.get_data()
+            bytes_out += len(data)
+            bytes_in += len(json.dumps(body)) if body is not None else 0
+            if res.status_code != 200 or (res.is_json and res.get_json().get("success") is False):
+                failures += 1
+    gh = fake.snapshot_stats()
+    latencies.sort()
+    return {
+        "runs": repeat,
+        "failures": failures,
+        "p50_ms": percentile(latencies, 0.50),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2),
+        "github_calls_per_op": round(gh["calls"] / repeat, 2),
+        "github_calls_by_method": {m: round(n / repeat, 2) for m, n in gh["by_method"].items()},
+        "github_bytes_sent_per_op": gh["bytes_in"] // repeat,
+        "github_bytes_received_per_op": gh["bytes_out"] // repeat,
+        "request_bytes_per_op": bytes_in // repeat,
+        "response_bytes_per_op": bytes_out // repeat,
+        "peak_rss_mb": round(rss.peak / 1048576, 1) if rss.peak else None
+    }
+
+
+def start_app(base_url, workdir):
+    os.environ.update(AXIS_GITHUB_API=base_url, AXIS_OPEN_BROWSER="0")
+    os.chdir(workdir)
+    import app
+    return app.start_my_app(serve=False).test_client()
+
+
+def stop_app(client):
+    """Wait for the app's background snapshot writes, so the work directory can be removed"""
+    client.application.extensions["axis_flush_snapshots"]()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[100, 1000, 10000, 50000])
+    parser.add_argument("--ops", nargs="+", default=OPERATIONS, choices=OPERATIONS)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--image-kb", type=int, default=150, help="size of each uploaded image")
+    parser.add_argument("--latency", type=float, default=0.0, help="fake GitHub latency per call, seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--log-level", default="WARNING", help="app log level while benchmarking")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    os.environ.setdefault("AXIS_LOG_LEVEL", args.log_level)
+    image_bytes = random.Random(args.seed).randbytes(args.image_kb * 1024)
+    image_b64 = base64.b64encode(image_bytes).decode()
+    fake = FakeGitHub(latency=args.latency, history=False, seed=args.seed)
+    server, base_url = serve(fake)
+
+    results = {"meta": {"python": sys.version.split()[0], "platform": sys.platform, "repeat": args.repeat,
+                        "image_kb": args.image_kb, "latency": args.latency,
+                        "started": time.strftime("%Y-%m-%dT%H:%M:%S")},
+               "sizes": {}}
+    with tempfile.TemporaryDirectory() as workdir:
+        client = start_app(base_url, workdir)
+        for size in args.sizes:
+            repo = f"bench/shop-{size}"
+            seed_repo(fake, repo, size, image_bytes)
+            setup = client.post("/api/setup", json={"repo": repo, "token": "bench-token"}).get_json()
+            if not setup.get("success"):
+                raise SystemExit(f"setup failed for {repo}: {setup}")
+            results["sizes"][size] = {}
+            for op in args.ops:
+                results["sizes"][size][op] = run_op(client, fake, repo, op, args.repeat, image_b64)
+                if not args.json:
+                    r = results["sizes"][size][op]
+                    print(f"{size:>6} {op:>14}: p50 {r['p50_ms']}ms  p95 {r['p95_ms']}ms  "
+                          f"gh {r['github_calls_per_op']}/op  rss {r['peak_rss_mb']}MB  fail {r['failures']}")
+            fake.put_files(repo, {path: None for path in fake.repo(repo).files("main")}, "Clear benchmark repo")
+        stop_app(client)
+        os.chdir(BENCH_DIR)
+    server.shutdown()
+    if resource is not None:
+        results["meta"]["process_peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                                                         / (1048576 if sys.platform == "darwin" else 1024), 1)
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
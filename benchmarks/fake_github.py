@@ -0,0 +1,470 @@
+"""Local stand-in for the parts of the GitHub REST API that app.py uses.
+
+Implements the contents API (GET/PUT/DELETE with sha checks) and the git data
+API (refs, commits, trees, blobs) on top of one in-memory object store, so
+both views stay consistent. Everything is deterministic for a given --seed:
+injected latency jitter, random 409s and 5xx all come from one seeded RNG.
+
+Run it as a server and point the app at it:
+
+    python benchmarks/fake_github.py --port 8765 --latency 0.05 --conflict-rate 0.02
+    AXIS_GITHUB_API=http://127.0.0.1:8765 python app.py
+
+or use it in-process from a benchmark:
+
+    fake = FakeGitHub(latency=0.02)
+    server, base_url = serve(fake)
+    os.environ["AXIS_GITHUB_API"] = base_url
+"""
+import argparse
+import base64
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qs
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+ROUTE = re.compile(r"^/repos/([^/]+/[^/]+)(?:/(contents|git)(?:/(.*))?)?$")
+STATUS_TEXT = {200: "OK", 201: "Created", 401: "Unauthorized", 403: "Forbidden", 404: "Not Found",
+               409: "Conflict", 422: "Unprocessable Entity", 500: "Internal Server Error",
+               502: "Bad Gateway", 503: "Service Unavailable"}
+SERVER_ERRORS = (500, 502, 503)
+UNREACHABLE_GRACE = 60  # seconds an object nothing points to survives pruning, e.g. a blob awaiting its commit
+
+
+class GitHubError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def sha1(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+def blob_sha(data):
+    """Same hash git gives a blob, so shas match what real GitHub would return"""
+    return sha1(b"blob %d\0" % len(data) + data)
+
+
+class Repo:
+    """Object store for one repository: blobs, flat path->blob trees, commits and branches"""
+
+    def __init__(self, name):
+        self.name = name
+        self.blobs = {}
+        self.trees = {}
+        self.commits = {}
+        self.branches = {}
+        self.born = {}
+        self.sequence = 0
+        self.commit({}, [], "Initial commit", "main")
+
+    def add_blob(self, data):
+        sha = blob_sha(data)
+        self.blobs[sha] = data
+        self.born.setdefault(sha, time.time())
+        return sha
+
+    def add_tree(self, entries):
+        sha = sha1("".join(f"{path} {entries[path]}\n" for path in sorted(entries)).encode())
+        self.trees[sha] = dict(entries)
+        self.born.setdefault(sha, time.time())
+        return sha
+
+    def new_commit(self, tree_sha, parents, message):
+        self.sequence += 1
+        sha = sha1(f"tree {tree_sha}\nparents {' '.join(parents)}\nseq {self.sequence}\n\n{message}".encode())
+        self.commits[sha] = {"tree": tree_sha, "parents": list(parents), "message": message}
+        self.born.setdefault(sha, time.time())
+        return sha
+
+    def commit(self, entries, parents, message, branch):
+        sha = self.new_commit(self.add_tree(entries), parents, message)
+        self.branches[branch] = sha
+        return sha
+
+    def head(self, branch):
+        if branch not in self.branches:
+            raise GitHubError(404, f"No commit found for the ref {branch}")
+        return self.branches[branch]
+
+    def files(self, branch):
+        return self.trees[self.commits[self.head(branch)]["tree"]]
+
+    def prune(self):
+        """Drop objects not reachable from a branch head (history off), once they are older than the grace period"""
+        cutoff = time.time() - UNREACHABLE_GRACE
+        heads = set(self.branches.values())
+        self.commits = {sha: dict(c, parents=[]) if sha in heads else c for sha, c in self.commits.items()
+                        if sha in heads or self.born[sha] > cutoff}
+        live_trees = {c["tree"] for c in self.commits.values()}
+        self.trees = {sha: t for sha, t in self.trees.items() if sha in live_trees or self.born[sha] > cutoff}
+        live_blobs = {b for t in self.trees.values() for b in t.values()}
+        self.blobs = {sha: b for sha, b in self.blobs.items() if sha in live_blobs or self.born[sha] > cutoff}
+        live = set(self.commits) | set(self.trees) | set(self.blobs)
+        self.born = {sha: t for sha, t in self.born.items() if sha in live}
+
+
+class FakeGitHub:
+    """WSGI app emulating api.github.com for app.py; thread-safe, deterministic per seed"""
+
+    def __init__(self, latency=0.0, jitter=0.0, conflict_rate=0.0, error_rate=0.0, rate_limit=5000,
+                 token=None, store=None, history=True, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.conflict_rate = conflict_rate
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.token = token
+        self.store = store
+        self.history = history
+        self.rng = random.Random(seed)
+        self.lock = threading.RLock()
+        self.repos = {}
+        self.scripted = []
+        self.window_start = time.time()
+        self.used = {}
+        self.reset_stats()
+        if store and os.path.exists(store):
+            self.load(store)
+
+    # Test and benchmark hooks
+
+    def repo(self, name):
+        with self.lock:
+            if name not in self.repos:
+                self.repos[name] = Repo(name)
+            return self.repos[name]
+
+    def put_file(self, repo, path, data, message="Seed file", branch="main"):
+        """Write a file directly, bypassing faults, latency and stats"""
+        self.put_files(repo, {path: data}, message, branch)
+
+    def put_files(self, repo, files, message="Seed files", branch="main"):
+        """Write many files as one commit; None deletes a path"""
+        with self.lock:
+            r = self.repo(repo)
+            entries = dict(r.files(branch))
+            for path, data in files.items():
+                if data is None:
+                    entries.pop(path, None)
+                else:
+                    entries[path] = r.add_blob(data)
+            r.commit(entries, [r.head(branch)], message, branch)
+            self.after_write(r)
+
+    def read_file(self, repo, path, branch="main"):
+        with self.lock:
+            r = self.repo(repo)
+            sha = r.files(branch).get(path)
+            return r.blobs[sha] if sha else None
+
+    def fail(self, status, times=1, method=None, path=None):
+        """Answer the next `times` matching requests with `status` (path is a substring match)"""
+        with self.lock:
+            self.scripted.append({"status": status, "times": times, "method": method, "path": path})
+
+    def reset_stats(self):
+        with self.lock:
+            self.stats = {"calls": 0, "by_method": {}, "by_status": {}, "bytes_in": 0, "bytes_out": 0}
+
+    def snapshot_stats(self):
+        with self.lock:
+            return json.loads(json.dumps(self.stats))
+
+    # Persistence
+
+    def load(self, path):
+        with open(path, encoding="utf-8") as f:
+            saved = json.load(f)
+        for name, files in saved.get("repos", {}).items():
+            r = self.repo(name)
+            entries = {p: r.add_blob(base64.b64decode(b64)) for p, b64 in files.items()}
+            r.commit(entries, [r.head("main")], "Restore from store", "main")
+
+    def save(self):
+        data = {"repos": {name: {p: base64.b64encode(r.blobs[sha]).decode() for p, sha in r.files("main").items()}
+                          for name, r in self.repos.items()}}
+        tmp = self.store + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, self.store)
+
+    def after_write(self, r):
+        if not self.history:
+            r.prune()
+        if self.store:
+            self.save()
+
+    # WSGI entry point
+
+    def __call__(self, environ, start_response):
+        method = environ["REQUEST_METHOD"]
+        path = environ.get("PATH_INFO", "")
+        query = {k: v[0] for k, v in parse_qs(environ.get("QUERY_STRING", "")).items()}
+        length = int(environ.get("CONTENT_LENGTH") or 0)
+        raw = environ["wsgi.input"].read(length) if length else b""
+
+        delay = self.latency
+        if self.jitter:
+            with self.lock:
+                delay += self.rng.uniform(0, self.jitter)
+        if delay:
+            time.sleep(delay)
+
+        with self.lock:
+            headers, limited = self.rate_headers(environ)
+            try:
+                if limited:
+                    raise GitHubError(403, "API rate limit exceeded")
+                self.check_auth(environ)
+                self.inject_fault(method, path)
+                body = json.loads(raw) if raw else {}
+                status, payload = self.dispatch(method, path, query, body)
+            except GitHubError as e:
+                status, payload = e.status, {"message": e.message,
+                                             "documentation_url": "https://docs.github.com/rest"}
+            except ValueError:
+                status, payload = 400, {"message": "Problems parsing JSON"}
+            out = json.dumps(payload).encode("utf-8")
+            self.count(method, status, len(raw), len(out))
+
+        headers.append(("Content-Type", "application/json; charset=utf-8"))
+        headers.append(("Content-Length", str(len(out))))
+        start_response(f"{status} {STATUS_TEXT.get(status, 'Error')}", headers)
+        return [out]
+
+    def count(self, method, status, bytes_in, bytes_out):
+        s = self.stats
+        s["calls"] += 1
+        s["by_method"][method] = s["by_method"].get(method, 0) + 1
+        s["by_status"][str(status)] = s["by_status"].get(str(status), 0) + 1
+        s["bytes_in"] += bytes_in
+        s["bytes_out"] += bytes_out
+
+    def rate_headers(self, environ):
+        now = time.time()
+        if now - self.window_start >= 3600:
+            self.window_start, self.used = now, {}
+        key = environ.get("HTTP_AUTHORIZATION", "")
+        self.used[key] = self.used.get(key, 0) + 1
+        used = self.used[key]
+        headers = [
+            ("X-RateLimit-Limit", str(self.rate_limit)),
+            ("X-RateLimit-Remaining", str(max(self.rate_limit - used, 0))),
+            ("X-RateLimit-Reset", str(int(self.window_start + 3600))),
+            ("X-RateLimit-Used", str(used)),
+            ("X-RateLimit-Resource", "core"),
+        ]
+        limited = used > self.rate_limit
+        if limited:
+            headers.append(("Retry-After", str(int(self.window_start + 3600 - now))))
+        return headers, limited
+
+    def check_auth(self, environ):
+        auth = environ.get("HTTP_AUTHORIZATION", "")
+        if not auth or (self.token and auth.split(" ", 1)[-1] != self.token):
+            raise GitHubError(401, "Bad credentials")
+
+    def inject_fault(self, method, path):
+        for rule in self.scripted:
+            if (rule["method"] in (None, method)) and (rule["path"] is None or rule["path"] in path):
+                rule["times"] -= 1
+                if rule["times"] <= 0:
+                    self.scripted.remove(rule)
+                raise GitHubError(rule["status"], "Injected failure")
+        if self.error_rate and self.rng.random() < self.error_rate:
+            raise GitHubError(self.rng.choice(SERVER_ERRORS), "Server Error")
+        if method in ("PUT", "DELETE") and "/contents/" in path and self.conflict_rate \
+                and self.rng.random() < self.conflict_rate:
+            raise GitHubError(409, "Injected conflict")
+
+    def dispatch(self, method, path, query, body):
+        match = ROUTE.match(path)
+        if not match:
+            raise GitHubError(404, "Not Found")
+        repo, api, rest = match.group(1), match.group(2), match.group(3) or ""
+        r = self.repo(repo)
+        if api is None and method == "GET":
+            return 200, {"full_name": repo, "name": repo.split("/")[1], "private": True, "default_branch": "main",
+                         "permissions": {"admin": True, "push": True, "pull": True}}
+        if api == "contents":
+            return self.contents(r, method, rest, query, body)
+        return self.git(r, method, rest, body)
+
+    # Contents API
+
+    def contents(self, r, method, path, query, body):
+        branch = query.get("ref") or body.get("branch") or "main"
+        files = r.files(branch)
+        if method == "GET":
+            if path in files:
+                data = r.blobs[files[path]]
+                return 200, dict(self.content_entry(path, files[path], len(data)), encoding="base64",
+                                 content=base64.encodebytes(data).decode())
+            prefix = path.rstrip("/") + "/" if path else ""
+            listing = {p: sha for p, sha in files.items() if p.startswith(prefix)}
+            if not listing:
+                raise GitHubError(404, "Not Found")
+            entries = []
+            for name in sorted({p[len(prefix):].split("/", 1)[0] for p in listing}):
+                sha = files.get(prefix + name)
+                if sha:
+                    entries.append(self.content_entry(prefix + name, sha, len(r.blobs[sha])))
+                else:
+                    entries.append(self.content_entry(prefix + name, None, 0, "dir"))
+            return 200, entries
+
+        current = files.get(path)
+        if method == "PUT":
+            if "content" not in body:
+                raise GitHubError(422, "Invalid request.\n\n\"content\" wasn't supplied.")
+            if current and not body.get("sha"):
+                raise GitHubError(422, "Invalid request.\n\n\"sha\" wasn't supplied.")
+            if body.get("sha") and body["sha"] != current:
+                raise GitHubError(409, f"{path} does not match {body['sha']}")
+            data = base64.b64decode(body["content"])
+            entries = dict(files, **{path: r.add_blob(data)})
+            commit = r.commit(entries, [r.head(branch)], body.get("message", ""), branch)
+            self.after_write(r)
+            return (200 if current else 201), {"content": self.content_entry(path, entries[path], len(data)),
+                                               "commit": self.commit_entry(r, commit)}
+        if method == "DELETE":
+            if not current:
+                raise GitHubError(404, "Not Found")
+            if body.get("sha") != current:
+                raise GitHubError(409, f"{path} does not match {body.get('sha')}")
+            entries = {p: sha for p, sha in files.items() if p != path}
+            commit = r.commit(entries, [r.head(branch)], body.get("message", ""), branch)
+            self.after_write(r)
+            return 200, {"content": None, "commit": self.commit_entry(r, commit)}
+        raise GitHubError(404, "Not Found")
+
+    def content_entry(self, path, sha, size, kind="file"):
+        return {"name": path.rsplit("/", 1)[-1], "path": path, "sha": sha, "size": size, "type": kind}
+
+    def commit_entry(self, r, sha):
+        c = r.commits[sha]
+        return {"sha": sha, "message": c["message"], "tree": {"sha": c["tree"]},
+                "parents": [{"sha": p} for p in c["parents"]]}
+
+    # Git data API
+
+    def git(self, r, method, rest, body):
+        kind, _, key = rest.partition("/")
+        if kind in ("ref", "refs") and method == "GET":
+            branch = key.replace("heads/", "", 1)
+            return 200, {"ref": f"refs/heads/{branch}", "object": {"sha": r.head(branch), "type": "commit"}}
+        if kind == "refs" and method == "POST":
+            branch = body.get("ref", "").replace("refs/heads/", "", 1)
+            if branch in r.branches:
+                raise GitHubError(422, "Reference already exists")
+            if body.get("sha") not in r.commits:
+                raise GitHubError(422, "Object does not exist")
+            r.branches[branch] = body["sha"]
+            return 201, {"ref": f"refs/heads/{branch}", "object": {"sha": body["sha"], "type": "commit"}}
+        if kind == "refs" and method == "PATCH":
+            branch = key.replace("heads/", "", 1)
+            new = body.get("sha")
+            if new not in r.commits:
+                raise GitHubError(422, "Object does not exist")
+            if not body.get("force") and r.head(branch) not in r.commits[new]["parents"] and new != r.head(branch):
+                raise GitHubError(422, "Update is not a fast forward")
+            r.branches[branch] = new
+            self.after_write(r)
+            return 200, {"ref": f"refs/heads/{branch}", "object": {"sha": new, "type": "commit"}}
+        if kind == "commits" and method == "GET":
+            if key not in r.commits:
+                raise GitHubError(404, "Not Found")
+            return 200, self.commit_entry(r, key)
+        if kind == "commits" and method == "POST":
+            if body.get("tree") not in r.trees:
+                raise GitHubError(422, "Tree SHA does not exist")
+            parents = body.get("parents", [])
+            if any(p not in r.commits for p in parents):
+                raise GitHubError(422, "Parent SHA does not exist")
+            return 201, self.commit_entry(r, r.new_commit(body["tree"], parents, body.get("message", "")))
+        if kind == "trees" and method == "GET":
+            # Trees are stored flat, so every listing is the recursive one
+            if key not in r.trees:
+                raise GitHubError(404, "Not Found")
+            return 200, {"sha": key, "truncated": False, "tree": [
+                {"path": p, "mode": "100644", "type": "blob", "sha": sha, "size": len(r.blobs[sha])}
+                for p, sha in sorted(r.trees[key].items())]}
+        if kind == "trees" and method == "POST":
+            entries = dict(r.trees.get(body.get("base_tree"), {}))
+            for item in body.get("tree", []):
+                if "content" in item:
+                    entries[item["path"]] = r.add_blob(item["content"].encode("utf-8"))
+                elif item.get("sha") is None:
+                    entries.pop(item["path"], None)
+                elif item["sha"] in r.blobs:
+                    entries[item["path"]] = item["sha"]
+                else:
+                    raise GitHubError(422, f"Blob {item['sha']} does not exist")
+            sha = r.add_tree(entries)
+            return 201, {"sha": sha, "truncated": False,
+                         "tree": [{"path": p, "mode": "100644", "type": "blob", "sha": s} for p, s in sorted(entries.items())]}
+        if kind == "blobs" and method == "GET":
+            if key not in r.blobs:
+                raise GitHubError(404, "Not Found")
+            data = r.blobs[key]
+            return 200, {"sha": key, "size": len(data), "encoding": "base64", "content": base64.encodebytes(data).decode()}
+        if kind == "blobs" and method == "POST":
+            content = body.get("content", "")
+            data = base64.b64decode(content) if body.get("encoding") == "base64" else content.encode("utf-8")
+            return 201, {"sha": r.add_blob(data)}
+        raise GitHubError(404, "Not Found")
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+def serve(fake, host="127.0.0.1", port=0):
+    """Serve fake on a background thread; returns (server, base_url). port=0 picks a free port"""
+    server = make_server(host, port, fake, server_class=ThreadingWSGIServer, handler_class=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random delay, up to this many seconds")
+    parser.add_argument("--conflict-rate", type=float, default=0.0, help="share of contents writes answered 409")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered 500/502/503")
+    parser.add_argument("--rate-limit", type=int, default=5000, help="requests per token per hour before 403")
+    parser.add_argument("--token", help="only accept this token (any non-empty token otherwise)")
+    parser.add_argument("--store", help="JSON file to load the repos from and save them to after every write")
+    parser.add_argument("--no-history", action="store_true", help="keep only the current tree of each branch")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    fake = FakeGitHub(latency=args.latency, jitter=args.jitter, conflict_rate=args.conflict_rate,
+                      error_rate=args.error_rate, rate_limit=args.rate_limit, token=args.token,
+                      store=args.store, history=not args.no_history, seed=args.seed)
+    server = make_server(args.host, args.port, fake, server_class=ThreadingWSGIServer, handler_class=QuietHandler)
+    print(f"Fake GitHub API on http://{args.host}:{server.server_port} (AXIS_GITHUB_API)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
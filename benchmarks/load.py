@@ -0,0 +1,257 @@
+"""Simulate several admins editing the same shop at once.
+
+Each admin is a thread with its own test client, looping over a weighted mix of
+reads (get-data), new-product uploads, edits and deletes for a fixed duration,
+against the app in-process with the fake GitHub backend. Like the real UI, an
+admin reloads after each change it makes and addresses products by the index it
+saw on its last read.
+
+Every admin edits and deletes only its "own" seeded products (id % admins), so
+once the run ends, any acknowledged change missing from the final catalog is a
+lost update, and any change to a product nobody targeted is a misdirected write.
+
+    python benchmarks/load.py --admins 1 2 3 5 --sizes 100 1000 --seconds 20 --plot load.png
+    python benchmarks/load.py --admins 3 --sizes 1000 --latency 0.1 --json
+"""
+import argparse
+import base64
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from admin_ops import BENCH_DIR, make_product, percentile, seed_repo, start_app, stop_app  # noqa: E402
+from fake_github import FakeGitHub, serve  # noqa: E402
+
+try:
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+except ImportError:
+    plt = None
+
+MIX = {"read": 40, "upload": 20, "edit": 25, "delete": 15}
+SEED_ID = make_product(0, "")["id"]
+
+
+class Admin(threading.Thread):
+    def __init__(self, number, admins, size, app, mix, stop_at, image_b64, seed):
+        super().__init__(daemon=True)
+        self.number = number
+        self.admins = admins
+        self.size = size
+        self.client = app.test_client()
+        self.mix = mix
+        self.stop_at = stop_at
+        self.image_b64 = image_b64
+        self.rng = random.Random(seed * 1000 + number)
+        self.snapshot = []
+        self.samples = []
+        self.uploaded = []
+        self.edits = {}
+        self.deleted = set()
+        self.ops = 0
+
+    def own(self, product):
+        seeded = product.get("id", 0) - SEED_ID
+        return 0 <= seeded < self.size and seeded % self.admins == self.number and product["id"] not in self.deleted
+
+    def call(self, action, url, body=None):
+        start = time.perf_counter()
+        res = self.client.open(url, method="POST" if body is not None else "GET", json=body)
+        elapsed = time.perf_counter() - start
+        data = res.get_json(silent=True) or {}
+        ok = res.status_code == 200 and data.get("success", True) is not False
+        self.samples.append((action, elapsed, ok))
+        return ok, data
+
+    def read(self):
+        ok, data = self.call("read", "/api/get-data")
+        if ok:
+            self.snapshot = data.get("products", [])
+
+    def upload(self):
+        title = f"admin{self.number}-new{self.ops}"
+        ok, _ = self.call("upload", "/api/upload", {"editIndex": -1, "product": {
+            "title": title, "price": 250, "category": "Category 1", "offer": 0,
+            "description": "Load test upload", "existingImages": [], "removedImages": [],
+            "newImages": [self.image_b64]}})
+        if ok:
+            self.uploaded.append(title)
+            self.read()
+
+    def pick_own(self):
+        owned = [(i, p) for i, p in enumerate(self.snapshot) if self.own(p)]
+        return self.rng.choice(owned) if owned else (None, None)
+
+    def edit(self):
+        index, product = self.pick_own()
+        if product is None:
+            return self.read()
+        title = f"admin{self.number}-edit{self.ops}"
+        ok, _ = self.call("edit", "/api/upload", {"editIndex": index, "editId": product["id"], "product": dict(
+            product, title=title, existingImages=product.get("images", []), removedImages=[], newImages=[])})
+        if ok:
+            self.edits[product["id"]] = title
+            self.read()
+
+    def delete(self):
+        index, product = self.pick_own()
+        if product is None:
+            return self.read()
+        ok, _ = self.call("delete", "/api/delete", {"index": index, "id": product["id"]})
+        if ok:
+            self.deleted.add(product["id"])
+            self.edits.pop(product["id"], None)
+            self.read()
+
+    def run(self):
+        actions, weights = zip(*self.mix.items())
+        self.read()
+        while time.time() < self.stop_at:
+            self.ops += 1
+            getattr(self, self.rng.choices(actions, weights)[0])()
+
+
+def audit(admins, final, size):
+    """Compare what each admin was told succeeded against the final catalog"""
+    by_id = {p.get("id"): p for p in final}
+    titles = {p.get("title") for p in final}
+    lost = {"upload": 0, "edit": 0, "delete": 0}
+    touched = set()
+    for a in admins:
+        lost["upload"] += sum(1 for t in a.uploaded if t not in titles)
+        lost["delete"] += sum(1 for pid in a.deleted if pid in by_id)
+        lost["edit"] += sum(1 for pid, t in a.edits.items() if by_id.get(pid, {}).get("title") != t)
+        touched |= a.deleted | set(a.edits)
+    misdirected = 0
+    for i in range(size):
+        original = make_product(i, "")
+        if original["id"] in touched:
+            continue
+        current = by_id.get(original["id"])
+        if current is None or current.get("title") != original["title"]:
+            misdirected += 1
+    return lost, misdirected
+
+
+def run_scenario(app, fake, repo, size, admins, seconds, mix, image_b64, seed):
+    seed_repo(fake, repo, size, b"img")
+    fake.reset_stats()
+    stop_at = time.time() + seconds
+    threads = [Admin(n, admins, size, app, mix, stop_at, image_b64, seed) for n in range(admins)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+
+    final = json.loads(fake.read_file(repo, "all_products.json"))
+    lost, misdirected = audit(threads, final, size)
+    gh = fake.snapshot_stats()
+    writes = gh["by_method"].get("PUT", 0) + gh["by_method"].get("DELETE", 0)
+    samples = [s for t in threads for s in t.samples]
+    latencies = sorted(s[1] for s in samples)
+    actions = {}
+    for action in sorted({s[0] for s in samples}):
+        ms = sorted(s[1] for s in samples if s[0] == action)
+        actions[action] = {"requests": len(ms), "failed": sum(1 for s in samples if s[0] == action and not s[2]),
+                           "p50_ms": percentile(ms, 0.50), "p95_ms": percentile(ms, 0.95),
+                           "p99_ms": percentile(ms, 0.99)}
+    return {
+        "admins": admins,
+        "catalog_size": size,
+        "requests": len(samples),
+        "failed": sum(1 for s in samples if not s[2]),
+        "throughput_rps": round(len(samples) / wall, 2),
+        "p50_ms": percentile(latencies, 0.50),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99),
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else None,
+        "mean_ms": round(statistics.mean(latencies) * 1000, 2) if latencies else None,
+        "github_writes": writes,
+        "github_409": gh["by_status"].get("409", 0),
+        "conflict_rate": round(gh["by_status"].get("409", 0) / writes, 4) if writes else 0.0,
+        "lost_updates": lost,
+        "lost_updates_total": sum(lost.values()),
+        "misdirected_writes": misdirected,
+        "actions": actions
+    }
+
+
+def plot(results, path):
+    sizes = sorted({r["catalog_size"] for r in results})
+    fig, axes = plt.subplots(1, 4, figsize=(18, 4))
+    panels = [("throughput_rps", "requests/s"), ("p95_ms", "p95 latency (ms)"),
+              ("conflict_rate", "409 share of writes"), ("lost_updates_total", "lost updates")]
+    for ax, (key, label) in zip(axes, panels):
+        for size in sizes:
+            rows = sorted((r for r in results if r["catalog_size"] == size), key=lambda r: r["admins"])
+            ax.plot([r["admins"] for r in rows], [r[key] for r in rows], marker="o", label=f"{size} products")
+        ax.set_xlabel("concurrent admins")
+        ax.set_ylabel(label)
+        ax.grid(alpha=0.3)
+    axes[0].legend()
+    fig.tight_layout()
+    fig.savefig(path, dpi=120)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--admins", nargs="+", type=int, default=[1, 2, 3, 5])
+    parser.add_argument("--sizes", nargs="+", type=int, default=[100, 1000])
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--mix", default=",".join(f"{k}={v}" for k, v in MIX.items()),
+                        help="action weights, e.g. read=40,upload=20,edit=25,delete=15")
+    parser.add_argument("--latency", type=float, default=0.02, help="fake GitHub latency per call, seconds")
+    parser.add_argument("--image-kb", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--log-level", default="ERROR", help="app log level while loading")
+    parser.add_argument("--plot", help="write a PNG of throughput, p95, conflicts and lost updates (needs matplotlib)")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    mix = {k: int(v) for k, v in (item.split("=") for item in args.mix.split(","))}
+    unknown = set(mix) - set(MIX)
+    if unknown:
+        raise SystemExit(f"Unknown actions in --mix: {', '.join(sorted(unknown))}")
+    os.environ.setdefault("AXIS_LOG_LEVEL", args.log_level)
+    image_b64 = base64.b64encode(random.Random(args.seed).randbytes(args.image_kb * 1024)).decode()
+    fake = FakeGitHub(latency=args.latency, history=False, seed=args.seed)
+    server, base_url = serve(fake)
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        client = start_app(base_url, workdir)
+        for size in args.sizes:
+            for admins in args.admins:
+                repo = f"load/shop-{size}-{admins}"
+                client.post("/api/setup", json={"repo": repo, "token": "load-token"})
+                r = run_scenario(client.application, fake, repo, size, admins, args.seconds, mix, image_b64, args.seed)
+                results.append(r)
+                if not args.json:
+                    print(f"{size:>6} products, {admins} admins: {r['throughput_rps']} req/s  "
+                          f"p95 {r['p95_ms']}ms  p99 {r['p99_ms']}ms  409s {r['github_409']}/{r['github_writes']}  "
+                          f"lost {r['lost_updates_total']} {r['lost_updates']}  misdirected {r['misdirected_writes']}")
+        stop_app(client)
+        os.chdir(BENCH_DIR)
+    server.shutdown()
+
+    if args.plot:
+        if plt is None:
+            print("matplotlib is not installed, skipping the plot", file=sys.stderr)
+        else:
+            plot(results, args.plot)
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
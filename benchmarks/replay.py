@@ -0,0 +1,219 @@
+"""Replay a recorded admin session against the fake GitHub backend.
+
+Record a real session by starting the app with AXIS_RECORD set; each API request is
+appended to a JSON-lines file as a sanitized shape (route, body structure, string
+lengths, image sizes, timing, status), never the actual text, images or token:
+
+    AXIS_RECORD=1 python app.py                      # recordings/session-<time>.jsonl
+    AXIS_RECORD=session.jsonl python app.py
+
+Then re-drive it in-process against benchmarks/fake_github.py, at the original pace
+or faster (--speed 0 sends everything as fast as the workers allow):
+
+    python benchmarks/replay.py recordings/session-20240101-120000.jsonl --speed 10 --size 5000
+
+Strings are rebuilt at their recorded length and images as random bytes of the
+recorded size. Spreadsheet imports are replayed as a CSV of about the same size whose
+rows all name one attached PNG of random pixels, sized like the recorded images field.
+"""
+import argparse
+import base64
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from admin_ops import BENCH_DIR, percentile, seed_repo, start_app, stop_app  # noqa: E402
+from fake_github import FakeGitHub, serve  # noqa: E402
+
+
+IMPORT_IMAGE = "replay.png"
+IMPORT_IMAGE_BYTES = 64 * 1024  # when the recorded import attached no images
+
+
+def load_session(paths):
+    entries = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            entries.extend(json.loads(line) for line in f if line.strip())
+    entries.sort(key=lambda e: e["t"])
+    return [e for e in entries if e.get("route") != "setup"]
+
+
+class Rebuilder:
+    """Turns recorded shapes back into concrete values, reusing one image per size"""
+
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+        self.images = {}
+        self.photos = {}
+
+    def image(self, size):
+        if size not in self.images:
+            self.images[size] = base64.b64encode(self.rng.randbytes(size)).decode()
+        return self.images[size]
+
+    def value(self, shape):
+        if isinstance(shape, dict):
+            if len(shape) == 1 and "str" in shape:
+                return "x" * shape["str"]
+            if len(shape) == 1 and "image" in shape:
+                return self.image(shape["image"])
+            return {k: self.value(v) for k, v in shape.items()}
+        if isinstance(shape, list):
+            return [self.value(v) for v in shape]
+        return shape
+
+    def photo(self, size):
+        """PNG of random pixels, about size bytes since noise does not compress"""
+        if size not in self.photos:
+            side = max(1, int((size / 3) ** 0.5))
+            out = io.BytesIO()
+            Image.frombytes("RGB", (side, side), self.rng.randbytes(side * side * 3)).save(out, format="PNG")
+            self.photos[size] = out.getvalue()
+        return self.photos[size]
+
+    def spreadsheet(self, size):
+        out = io.StringIO()
+        out.write("title,price,category,offer,description,images\n")
+        i = 0
+        while out.tell() < size:
+            out.write(f"Replayed product {i},{100 + i},Category {i % 12},0,Replayed from a recorded import,"
+                      f"{IMPORT_IMAGE}\n")
+            i += 1
+        return io.BytesIO(out.getvalue().encode("utf-8"))
+
+    def request(self, entry):
+        """Keyword arguments for client.open()"""
+        kwargs = {"method": entry["method"], "query_string": self.value(entry.get("query") or {})}
+        if entry.get("files"):
+            data = self.value(entry.get("form") or {})
+            files = dict(entry["files"])
+            images = files.pop("images", {"bytes": IMPORT_IMAGE_BYTES})
+            for name, f in files.items():
+                data[name] = (self.spreadsheet(f["bytes"]), "replay.csv")
+            data["images"] = (io.BytesIO(self.photo(images["bytes"])), IMPORT_IMAGE)
+            kwargs.update(data=data, content_type="multipart/form-data")
+        elif entry.get("body") is not None:
+            kwargs["json"] = self.value(entry["body"])
+        return kwargs
+
+
+def replay(app, entries, rebuilder, speed, workers):
+    local = threading.local()
+    results = []
+    lock = threading.Lock()
+    prepared = [(e, rebuilder.request(e)) for e in entries]
+    t0 = entries[0]["t"] if entries else 0
+
+    def send(entry, kwargs, due):
+        if not hasattr(local, "client"):
+            local.client = app.test_client()
+        lag = time.perf_counter() - due
+        start = time.perf_counter()
+        res = local.client.open(entry["path"], **kwargs)
+        elapsed = time.perf_counter() - start
+        body = res.get_json(silent=True)
+        failed = res.status_code >= 400 or (isinstance(body, dict) and body.get("success") is False)
+        with lock:
+            results.append({"route": entry["route"], "ms": elapsed, "recorded_ms": entry.get("ms"),
+                            "failed": failed, "lag": max(lag, 0)})
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for entry, kwargs in prepared:
+            due = start + ((entry["t"] - t0) / speed if speed else 0)
+            wait = due - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+            pool.submit(send, entry, kwargs, due)
+    return results, time.perf_counter() - start
+
+
+def summarize(results, wall, github):
+    by_route = {}
+    for r in results:
+        by_route.setdefault(r["route"], []).append(r)
+    lat = sorted(r["ms"] for r in results)
+    routes = {}
+    for route, items in sorted(by_route.items()):
+        ms = sorted(r["ms"] for r in items)
+        recorded = sorted(r["recorded_ms"] / 1000 for r in items if r["recorded_ms"] is not None)
+        routes[route] = {"requests": len(items), "failures": sum(r["failed"] for r in items),
+                         "p50_ms": percentile(ms, 0.50), "p95_ms": percentile(ms, 0.95),
+                         "recorded_p50_ms": percentile(recorded, 0.50)}
+    return {
+        "requests": len(results),
+        "failures": sum(r["failed"] for r in results),
+        "seconds": round(wall, 2),
+        "throughput_rps": round(len(results) / wall, 2) if wall else None,
+        "p50_ms": percentile(lat, 0.50),
+        "p95_ms": percentile(lat, 0.95),
+        "p99_ms": percentile(lat, 0.99),
+        "mean_ms": round(statistics.mean(lat) * 1000, 2) if lat else None,
+        "max_schedule_lag_ms": round(max((r["lag"] for r in results), default=0) * 1000, 2),
+        "github_calls": github["calls"],
+        "github_calls_by_method": github["by_method"],
+        "routes": routes
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("sessions", nargs="+", help="recorded JSON-lines files (AXIS_RECORD)")
+    parser.add_argument("--speed", type=float, default=1.0, help="time compression; 0 = no pauses")
+    parser.add_argument("--workers", type=int, default=4, help="requests allowed in flight at once")
+    parser.add_argument("--size", type=int, default=1000, help="products in the seeded catalog")
+    parser.add_argument("--latency", type=float, default=0.0, help="fake GitHub latency per call, seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--log-level", default="WARNING", help="app log level while replaying")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    entries = load_session(args.sessions)
+    if not entries:
+        raise SystemExit("No requests in the recording")
+    os.environ.setdefault("AXIS_LOG_LEVEL", args.log_level)
+    os.environ.pop("AXIS_RECORD", None)
+    fake = FakeGitHub(latency=args.latency, history=False, seed=args.seed)
+    server, base_url = serve(fake)
+    repo = "replay/shop"
+    seed_repo(fake, repo, args.size, random.Random(args.seed).randbytes(64 * 1024))
+
+    with tempfile.TemporaryDirectory() as workdir:
+        client = start_app(base_url, workdir)
+        setup = client.post("/api/setup", json={"repo": repo, "token": "replay-token"}).get_json()
+        if not setup.get("success"):
+            raise SystemExit(f"setup failed: {setup}")
+        fake.reset_stats()
+        results, wall = replay(client.application, entries, Rebuilder(args.seed), args.speed, args.workers)
+        stop_app(client)
+        os.chdir(BENCH_DIR)
+    server.shutdown()
+
+    summary = summarize(results, wall, fake.snapshot_stats())
+    summary["meta"] = {"sessions": args.sessions, "speed": args.speed, "workers": args.workers,
+                       "catalog_size": args.size, "latency": args.latency}
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+    print(f"{summary['requests']} requests in {summary['seconds']}s ({summary['throughput_rps']} req/s), "
+          f"p50 {summary['p50_ms']}ms p95 {summary['p95_ms']}ms p99 {summary['p99_ms']}ms, "
+          f"{summary['failures']} failed, {summary['github_calls']} GitHub calls")
+    for route, r in summary["routes"].items():
+        print(f"  {route:>16}: {r['requests']:>4} req  p50 {r['p50_ms']}ms (recorded {r['recorded_p50_ms']}ms)  "
+              f"p95 {r['p95_ms']}ms  fail {r['failures']}")
+
+
+if __name__ == "__main__":
+    main()
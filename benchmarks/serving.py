@@ -0,0 +1,141 @@
+"""Compare requests/s of the serving backends on /api/get-data.
+
+Each backend is started as a separate `python app.py` process (AXIS_SERVER=...)
+in a scratch directory, pointed at benchmarks/fake_github.py through
+AXIS_GITHUB_API and set up against a seeded catalog, so every response carries
+the real products/settings/banners payload. It is then hammered by client
+threads with keep-alive sessions for a fixed duration.
+
+    python benchmarks/serving.py --backends werkzeug threadpool waitress --clients 16 --seconds 10
+    python benchmarks/serving.py --size 10000 --latency 0.05
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from admin_ops import seed_repo  # noqa: E402
+from fake_github import FakeGitHub, serve  # noqa: E402
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+def wait_until_up(url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            requests.get(url, timeout=1)
+            return True
+        except requests.RequestException:
+            time.sleep(0.2)
+    return False
+
+
+def hammer(url, clients, seconds):
+    latencies = []
+    sizes = []
+    errors = [0]
+    lock = threading.Lock()
+    stop_at = time.time() + seconds
+
+    def worker():
+        session = requests.Session()
+        local, failed, size = [], 0, 0
+        while time.time() < stop_at:
+            start = time.perf_counter()
+            try:
+                res = session.get(url, timeout=30)
+                ok = res.status_code == 200
+                size = len(res.content)
+            except requests.RequestException:
+                ok = False
+            if ok:
+                local.append(time.perf_counter() - start)
+            else:
+                failed += 1
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+            sizes.append(size)
+
+    threads = [threading.Thread(target=worker) for _ in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    latencies.sort()
+    pct = lambda p: round(latencies[min(int(len(latencies) * p), len(latencies) - 1)] * 1000, 2) if latencies else None
+    return {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "rps": round(len(latencies) / seconds, 1),
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 2) if latencies else None,
+        "response_bytes": max(sizes, default=0)
+    }
+
+
+def bench_backend(backend, port, args, github_url, repo):
+    env = dict(os.environ, AXIS_SERVER=backend, AXIS_PORT=str(port), AXIS_OPEN_BROWSER="0",
+               AXIS_THREADS=str(args.threads), AXIS_GITHUB_API=github_url)
+    env.pop("AXIS_RECORD", None)
+    with tempfile.TemporaryDirectory() as workdir:
+        proc = subprocess.Popen([sys.executable, APP_PATH], cwd=workdir, env=env,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            base = f"http://127.0.0.1:{port}"
+            if not wait_until_up(base + "/api/get-data"):
+                return {"error": "server did not start"}
+            setup = requests.post(base + "/api/setup", json={"repo": repo, "token": "serving-token"}, timeout=30).json()
+            if not setup.get("success"):
+                return {"error": f"setup failed: {setup}"}
+            products = len(requests.get(base + "/api/get-data", timeout=60).json().get("products", []))
+            if products != args.size:
+                return {"error": f"expected {args.size} products, got {products}"}
+            return hammer(base + "/api/get-data", args.clients, args.seconds)
+        finally:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["werkzeug", "threadpool", "waitress"])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--threads", type=int, default=8, help="server worker threads (AXIS_THREADS)")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--size", type=int, default=1000, help="products in the seeded catalog")
+    parser.add_argument("--latency", type=float, default=0.0, help="fake GitHub latency per call, seconds")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    fake = FakeGitHub(latency=args.latency, history=False)
+    server, github_url = serve(fake)
+    repo = f"serving/shop-{args.size}"
+    seed_repo(fake, repo, args.size, b"img")
+
+    results = {}
+    for i, backend in enumerate(args.backends):
+        results[backend] = bench_backend(backend, args.port + i, args, github_url, repo)
+        if not args.json:
+            print(f"{backend:>10}: {results[backend]}")
+    server.shutdown()
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Checks that benchmarks/fake_github.py answers like the GitHub API app.py relies on.
+
+    python -m pytest benchmarks/test_fake_github.py
+"""
+import base64
+import os
+import sys
+
+import pytest
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_github import FakeGitHub, blob_sha, serve  # noqa: E402
+
+REPO = "test/shop"
+HEADERS = {"Authorization": "token test-token"}
+
+
+@pytest.fixture
+def github():
+    fake = FakeGitHub(history=False)
+    server, base_url = serve(fake)
+    session = requests.Session()
+    session.headers.update(HEADERS)
+
+    def call(method, path, **kwargs):
+        return session.request(method, f"{base_url}/repos/{REPO}/{path}", timeout=10, **kwargs)
+
+    yield fake, call
+    server.shutdown()
+    server.server_close()
+
+
+def b64(data):
+    return base64.b64encode(data).decode()
+
+
+def test_contents_put_needs_current_sha(github):
+    fake, call = github
+    created = call("PUT", "contents/data.json", json={"message": "add", "content": b64(b"[1]")})
+    assert created.status_code == 201
+    sha = created.json()["content"]["sha"]
+    assert sha == blob_sha(b"[1]")
+
+    got = call("GET", "contents/data.json")
+    assert got.status_code == 200
+    assert got.json()["sha"] == sha
+    assert base64.b64decode(got.json()["content"]) == b"[1]"
+
+    # Overwriting an existing file without its sha, or with a stale one, is refused
+    assert call("PUT", "contents/data.json", json={"message": "x", "content": b64(b"[2]")}).status_code == 422
+    updated = call("PUT", "contents/data.json", json={"message": "x", "content": b64(b"[2]"), "sha": sha})
+    assert updated.status_code == 200
+    stale = call("PUT", "contents/data.json", json={"message": "x", "content": b64(b"[3]"), "sha": sha})
+    assert stale.status_code == 409
+    assert fake.read_file(REPO, "data.json") == b"[2]"
+
+
+def test_git_data_round_trip(github):
+    fake, call = github
+    fake.put_file(REPO, "keep.json", b"{}")
+
+    blob = call("POST", "git/blobs", json={"content": b64(b"image bytes"), "encoding": "base64"})
+    assert blob.status_code == 201
+    assert blob.json()["sha"] == blob_sha(b"image bytes")
+
+    head = call("GET", "git/ref/heads/main").json()["object"]["sha"]
+    base_tree = call("GET", f"git/commits/{head}").json()["tree"]["sha"]
+    tree = call("POST", "git/trees", json={"base_tree": base_tree, "tree": [
+        {"path": "images/a.webp", "mode": "100644", "type": "blob", "sha": blob.json()["sha"]}]})
+    assert tree.status_code == 201
+    commit = call("POST", "git/commits", json={"message": "add image", "tree": tree.json()["sha"], "parents": [head]})
+    assert commit.status_code == 201
+    assert call("PATCH", "git/refs/heads/main", json={"sha": commit.json()["sha"]}).status_code == 200
+
+    assert fake.read_file(REPO, "images/a.webp") == b"image bytes"
+    assert fake.read_file(REPO, "keep.json") == b"{}"
+    listing = call("GET", f"git/trees/{tree.json()['sha']}").json()["tree"]
+    assert sorted(entry["path"] for entry in listing) == ["images/a.webp", "keep.json"]
+
+    # A commit built on a head that has since moved is not a fast forward
+    fake.put_file(REPO, "other.json", b"[]")
+    assert call("PATCH", "git/refs/heads/main", json={"sha": commit.json()["sha"]}).status_code == 422
+
+
+def test_scripted_faults(github):
+    fake, call = github
+    fake.put_file(REPO, "data.json", b"[]")
+    fake.fail(503, times=2, method="GET", path="data.json")
+
+    assert call("GET", "contents/data.json").status_code == 503
+    assert call("GET", "contents/data.json").status_code == 503
+    assert call("GET", "contents/data.json").status_code == 200
+    # Other methods and paths were never affected
+    fake.fail(500, method="PUT")
+    assert call("GET", "contents/data.json").status_code == 200
+    assert call("PUT", "contents/data.json", json={"message": "x", "content": b64(b"[1]")}).status_code == 500
+
+    stats = fake.snapshot_stats()
+    assert stats["by_status"]["503"] == 2
+    assert stats["by_status"]["500"] == 1
+
+
+def test_rate_limit():
+    fake = FakeGitHub(rate_limit=2)
+    server, base_url = serve(fake)
+    try:
+        statuses = [requests.get(f"{base_url}/repos/{REPO}", headers=HEADERS, timeout=10) for _ in range(3)]
+        assert [r.status_code for r in statuses] == [200, 200, 403]
+        assert statuses[1].headers["X-RateLimit-Remaining"] == "0"
+        assert "Retry-After" in statuses[2].headers
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,153 @@
+"""Build static/vendor/: Font Awesome subset, Inter and SweetAlert2 served by the app at /static.
+
+Run before packaging (the build workflow does this):
+
+    pip install fontawesomefree fonttools brotli requests
+    python vendor_assets.py
+
+Font Awesome comes from the `fontawesomefree` pip package and is cut down to
+the icons app.py actually uses. Inter and SweetAlert2 are taken from their npm
+tarballs. Anything that cannot be fetched is reported and skipped (and the exit
+status is non-zero, failing the build); the app then renders without Inter, in
+the system font, and keeps loading SweetAlert2 from its CDN.
+"""
+import hashlib
+import io
+import os
+import re
+import sys
+import tarfile
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+VENDOR_DIR = os.path.join(BASE_DIR, "static", "vendor")
+TEMPLATE_SOURCE = os.path.join(BASE_DIR, "app.py")
+
+SWEETALERT_VERSION = "11.10.5"
+INTER_VERSION = "5.0.16"
+INTER_WEIGHTS = [300, 400, 500, 600, 700]
+NPM_TARBALL = "https://registry.npmjs.org/{name}/-/{base}-{version}.tgz"
+
+FONTAWESOME_CSS = """/*!
+ * Font Awesome Free {version} subset - https://fontawesome.com
+ * License - https://fontawesome.com/license/free (Icons: CC BY 4.0, Fonts: SIL OFL 1.1, Code: MIT License)
+ */
+@font-face {{
+  font-family: 'Font Awesome 6 Free';
+  font-style: normal;
+  font-weight: 900;
+  font-display: block;
+  src: url("fa-solid-900.subset.woff2?v={font_version}") format("woff2"); }}
+
+.fa, .fas, .fa-solid {{
+  -moz-osx-font-smoothing: grayscale;
+  -webkit-font-smoothing: antialiased;
+  display: var(--fa-display, inline-block);
+  font-family: 'Font Awesome 6 Free';
+  font-style: normal;
+  font-variant: normal;
+  font-weight: 900;
+  line-height: 1;
+  text-rendering: auto; }}
+
+.fa-spin {{
+  animation: fa-spin var(--fa-animation-duration, 2s) linear infinite; }}
+
+@keyframes fa-spin {{
+  0% {{ transform: rotate(0deg); }}
+  100% {{ transform: rotate(360deg); }} }}
+
+{icons}
+"""
+
+
+def used_icons():
+    """Icon names referenced anywhere in the templates and their scripts"""
+    with open(TEMPLATE_SOURCE, encoding="utf-8") as f:
+        names = set(re.findall(r"\bfa-([a-z0-9-]+)", f.read()))
+    return names - {"spin", "solid"}
+
+
+def npm_file(name, version, member):
+    import requests
+    base = name.split("/")[-1]
+    res = requests.get(NPM_TARBALL.format(name=name, base=base, version=version), timeout=60)
+    res.raise_for_status()
+    with tarfile.open(fileobj=io.BytesIO(res.content), mode="r:gz") as tar:
+        return tar.extractfile(f"package/{member}").read()
+
+
+def write(filename, data):
+    """Write a vendored file; returns a short content hash for cache-busting URLs"""
+    path = os.path.join(VENDOR_DIR, filename)
+    with open(path, "wb") as f:
+        f.write(data)
+    print(f"  {filename}: {len(data) / 1024:.1f} KB")
+    return hashlib.sha256(data).hexdigest()[:10]
+
+
+def vendor_fontawesome():
+    import fontawesomefree
+    from fontTools import subset
+
+    root = os.path.join(os.path.dirname(fontawesomefree.__file__), "static", "fontawesomefree")
+    with open(os.path.join(root, "css", "fontawesome.css"), encoding="utf-8") as f:
+        css = f.read()
+    version = re.search(r"Font Awesome Free ([\d.]+)", css).group(1)
+    codepoints = dict(re.findall(r'\.fa-([a-z0-9-]+)::before\s*\{\s*content:\s*"\\([0-9a-f]+)"', css))
+
+    names = sorted(used_icons())
+    missing = [n for n in names if n not in codepoints]
+    if missing:
+        print(f"  no glyph for: {', '.join(missing)}")
+    icons = {n: codepoints[n] for n in names if n in codepoints}
+
+    options = subset.Options()
+    options.flavor = "woff2"
+    options.layout_features = []
+    font = subset.load_font(os.path.join(root, "webfonts", "fa-solid-900.ttf"), options)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=[int(cp, 16) for cp in set(icons.values())])
+    subsetter.subset(font)
+    out = io.BytesIO()
+    subset.save_font(font, out, options)
+    font_version = write("fa-solid-900.subset.woff2", out.getvalue())
+
+    rules = "\n\n".join(f'.fa-{name}::before {{\n  content: "\\{cp}"; }}' for name, cp in icons.items())
+    write("fontawesome.css", FONTAWESOME_CSS.format(version=version, font_version=font_version, icons=rules).encode("utf-8"))
+
+
+def vendor_inter():
+    faces = []
+    for weight in INTER_WEIGHTS:
+        filename = f"inter-latin-{weight}-normal.woff2"
+        font_version = write(filename, npm_file("@fontsource/inter", INTER_VERSION, f"files/{filename}"))
+        faces.append(
+            "@font-face {\n"
+            "  font-family: 'Inter';\n"
+            "  font-style: normal;\n"
+            "  font-display: swap;\n"
+            f"  font-weight: {weight};\n"
+            f"  src: url(\"{filename}?v={font_version}\") format(\"woff2\"); }}"
+        )
+    write("inter.css", ("\n\n".join(faces) + "\n").encode("utf-8"))
+
+
+def vendor_sweetalert():
+    write("sweetalert2.all.min.js", npm_file("sweetalert2", SWEETALERT_VERSION, "dist/sweetalert2.all.min.js"))
+
+
+def main():
+    os.makedirs(VENDOR_DIR, exist_ok=True)
+    failed = []
+    for name, step in (("Font Awesome", vendor_fontawesome), ("Inter", vendor_inter), ("SweetAlert2", vendor_sweetalert)):
+        print(f"{name}:")
+        try:
+            step()
+        except Exception as e:
+            print(f"  skipped: {e}")
+            failed.append(name)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())